@@ -89,6 +89,14 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="127.0.0.1", port=8001)
+    # uvloop's event loop is 2-4x faster than the default for I/O-heavy
+    # workloads; fall back silently where it is not installed (e.g. Windows)
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
+
+    uvicorn.run(app, host="127.0.0.1", port=8001, loop=loop)
 
 
@@ -12,8 +12,22 @@ from typing import Dict, List, Any
 import openai
 from openai import OpenAI
 
-# Set up OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI client, created lazily on first use so importing this module never
+# requires credentials (and a missing key fails with a clear error instead of
+# authentication failures deep inside the API call)
+_client = None
+
+
+def _get_client() -> OpenAI:
+    global _client
+    if _client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "OPENAI_API_KEY is not set; export it before running compute_metrics.py"
+            )
+        _client = OpenAI(api_key=api_key)
+    return _client
 
 EVALUATION_PROMPT = """You are an expert evaluator scoring research reports on a scale of 1-5.
 
@@ -54,7 +68,7 @@ Output STRICT JSON only:
 def evaluate_report(report_text: str) -> Dict[str, float]:
     """Evaluate a single report using GPT-4o."""
     try:
-        response = client.chat.completions.create(
+        response = _get_client().chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an expert evaluator. Output only valid JSON."},
@@ -0,0 +1,254 @@
+"""
+On-disk response cache for repeated LLM calls.
+
+Entries are keyed by a hash of (model, messages, temperature) so repeated
+debugging runs on the same example return near-instantly instead of re-issuing
+identical requests. Caching applies at temperature == 0, where the call is
+deterministic, or for sampled runs that explicitly opt in with
+MAD_CACHE_SAMPLED=1 (freezing one draw per prompt); set MAD_NO_CACHE=1 to
+bypass the cache entirely.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+CACHE_DIR = os.path.expanduser(os.getenv("MAD_CACHE_DIR", "~/.mad_cache"))
+CACHE_TTL_SECONDS = 14 * 24 * 3600  # 14 days
+CACHE_MAX_ENTRIES = 10000
+
+# Semantic cache: near-duplicate questions (same drug class, same anatomical
+# system, reworded stems) reuse each other's Round-1 responses. 0.90 is a
+# deliberately high threshold - a false hit on a medical question is worse
+# than a cache miss
+SEMANTIC_DIR = os.path.join(CACHE_DIR, "semantic")
+SEMANTIC_THRESHOLD = float(os.getenv("MAD_SEMANTIC_THRESHOLD", "0.90"))
+SEMANTIC_EMBED_MODEL = os.getenv("MAD_EMBED_MODEL", "all-MiniLM-L6-v2")
+
+
+class CachedResponse:
+    """Minimal stand-in for a provider response object (only .content is used)."""
+
+    def __init__(self, content: str):
+        self.content = content
+
+
+# Key hashing and entry (de)serialization sit on the hot path of every cached
+# call; orjson is several times faster than stdlib json and emits bytes
+# directly, but the cache works with either
+def _json_dumps(obj, sort_keys: bool = False) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(data: bytes):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _cache_key(agent, messages: list) -> str:
+    payload = {"model": str(agent.model), "msgs": messages, "t": agent.temperature}
+    return hashlib.sha256(_json_dumps(payload, sort_keys=True)).hexdigest()
+
+
+def _cache_enabled(agent) -> bool:
+    if os.getenv("MAD_NO_CACHE") == "1":
+        return False
+    if agent.temperature == 0:
+        return True
+    # Sampling at temperature > 0 is non-deterministic; caching would freeze a
+    # single draw and silently change experiment behavior. Repeated debugging
+    # runs can opt in explicitly (the key already includes temperature, so
+    # different settings never collide) via MAD_CACHE_SAMPLED=1.
+    return os.getenv("MAD_CACHE_SAMPLED") == "1"
+
+
+# Single-flight bookkeeping: concurrent worker threads that miss on the same
+# key share one in-flight call instead of each issuing a duplicate request
+_inflight: dict = {}
+_inflight_lock = threading.Lock()
+
+
+def cached_invoke(agent, messages: list):
+    """Invoke `agent` with `messages`, reusing an on-disk cached response when possible."""
+    if not _cache_enabled(agent):
+        return agent.invoke(messages)
+
+    key = _cache_key(agent, messages)
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < CACHE_TTL_SECONDS:
+            with open(path, "rb") as f:
+                return CachedResponse(_json_loads(f.read())["content"])
+    except Exception:
+        pass  # unreadable/corrupt entries are treated as misses
+
+    # Single-flight: the first thread to miss becomes the leader and issues
+    # the real call; followers on the same key wait on its result
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+    if not leader:
+        content = future.result()
+        if content:
+            return CachedResponse(content)
+        return agent.invoke(messages)  # leader got nothing usable
+
+    try:
+        response = agent.invoke(messages)
+        content = getattr(response, "content", None)
+        if content:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(_json_dumps({"content": content, "ts": time.time()}))
+                _evict_lru()
+            except Exception:
+                pass  # cache writes are best-effort
+        future.set_result(content or "")
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+    return response
+
+
+# --- Semantic cache (Round-1 only) ----------------------------------------
+#
+# Rounds 2-6 are context-dependent on the specific debate trajectory, so
+# semantic reuse is only safe for the Round-1 initial analysis, which depends
+# on nothing but the question and choices. Entries are stored per model (an
+# Agent-A response is never served to Agent B). The same gating as the
+# exact-match cache applies: temperature == 0, or an explicit
+# MAD_CACHE_SAMPLED=1 opt-in - serving a frozen draw to a sampling agent (and
+# for near-duplicate, not even identical, questions) must never happen
+# silently. When sentence-transformers is not installed the lookup/store
+# helpers degrade to no-ops and callers simply fall through to the real
+# invocation.
+
+_embedder = None
+_semantic_entries = None  # [(model, embedding, content)], loaded once per process
+
+
+def _get_embedder():
+    global _embedder
+    if _embedder is None:
+        _embedder = SentenceTransformer(SEMANTIC_EMBED_MODEL)
+    return _embedder
+
+
+def _embed(text: str) -> list:
+    return _get_embedder().encode(text, normalize_embeddings=True).tolist()
+
+
+def _load_semantic_entries() -> list:
+    global _semantic_entries
+    if _semantic_entries is None:
+        _semantic_entries = []
+        try:
+            for name in os.listdir(SEMANTIC_DIR):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(SEMANTIC_DIR, name)
+                if time.time() - os.path.getmtime(path) >= CACHE_TTL_SECONDS:
+                    continue
+                with open(path, "rb") as f:
+                    entry = _json_loads(f.read())
+                _semantic_entries.append((entry["model"], entry["embedding"], entry["content"]))
+        except FileNotFoundError:
+            pass
+        except Exception:
+            pass  # a corrupt entry just shrinks the index
+    return _semantic_entries
+
+
+def _cosine(a: list, b: list) -> float:
+    # Embeddings are stored normalized, so cosine similarity is a plain dot
+    # product; at cache sizes of a few hundred entries a linear scan beats
+    # the fixed cost of an ANN index
+    return sum(x * y for x, y in zip(a, b))
+
+
+def semantic_lookup(agent, key_text: str):
+    """Return the cached Round-1 content for a near-duplicate of `key_text`, or None."""
+    if not SENTENCE_TRANSFORMERS_AVAILABLE or not _cache_enabled(agent):
+        return None
+    try:
+        query = _embed(key_text)
+        model = str(agent.model)
+        best, best_sim = None, SEMANTIC_THRESHOLD
+        for entry_model, embedding, content in _load_semantic_entries():
+            if entry_model != model:
+                continue
+            sim = _cosine(query, embedding)
+            if sim >= best_sim:
+                best, best_sim = content, sim
+        return best
+    except Exception:
+        return None  # semantic lookups are best-effort
+
+
+def semantic_store(agent, key_text: str, content: str):
+    """Store a Round-1 response under its question embedding (best-effort)."""
+    if not SENTENCE_TRANSFORMERS_AVAILABLE or not _cache_enabled(agent) or not content:
+        return
+    try:
+        model = str(agent.model)
+        embedding = _embed(key_text)
+        key = hashlib.sha256(_json_dumps({"model": model, "key": key_text})).hexdigest()
+        os.makedirs(SEMANTIC_DIR, exist_ok=True)
+        with open(os.path.join(SEMANTIC_DIR, f"{key}.json"), "wb") as f:
+            f.write(_json_dumps({"model": model, "embedding": embedding,
+                                 "content": content, "ts": time.time()}))
+        _load_semantic_entries().append((model, embedding, content))
+    except Exception:
+        pass
+
+
+def _evict_lru():
+    """Drop the oldest entries once the cache exceeds CACHE_MAX_ENTRIES."""
+    try:
+        entries = [
+            os.path.join(CACHE_DIR, name)
+            for name in os.listdir(CACHE_DIR)
+            if name.endswith(".json")
+        ]
+        if len(entries) <= CACHE_MAX_ENTRIES:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[: len(entries) - CACHE_MAX_ENTRIES]:
+            os.remove(path)
+    except Exception:
+        pass
+
+
+def clear_cache() -> int:
+    """Remove all cached responses. Returns the number of entries removed."""
+    removed = 0
+    try:
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith(".json"):
+                os.remove(os.path.join(CACHE_DIR, name))
+                removed += 1
+    except FileNotFoundError:
+        pass
+    return removed
@@ -1,9 +1,14 @@
 
 from typing import Dict, Any
+import hashlib
 import json
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from langgraph.graph import StateGraph, END
 from .models import LLMFactory
+from .cache import semantic_lookup, semantic_store
 from .prompts import parse_json_or_fallback, normalize_probs, get_choice_keys, parse_judge_json
 from .metrics import compute_round_metrics
 
@@ -12,9 +17,59 @@ DebateState = dict
 
 logger = logging.getLogger(__name__)
 
+# Two-tier cache for the mini-research step. Research output depends only on
+# the question and choices, so repeated/resumed runs can skip the remote call:
+# tier 1 is an exact-match in-process dict keyed on a hash of the full prompt,
+# tier 2 is the shared on-disk semantic cache (near-duplicate questions reuse
+# each other's research when sentence-transformers is installed).
+_research_cache: Dict[str, str] = {}
+
+# Judge calls for round N only produce crit scores and metrics - round N+1's
+# prompts never read them - so they run on this worker pool while the debate
+# advances to the next round; FinalJudge resolves them in round order. Each
+# per-round judge call then overlaps the next agent round-trip instead of
+# serializing with it.
+_JUDGE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="judge")
+
+# Once both agents pick the same answer with at least this much probability
+# mass, later rounds only re-confirm the verdict; the graph routes straight to
+# FinalJudge instead of spending the remaining agent/judge round-trips. The
+# first three rounds always run so the debate has a chance to flip positions.
+CONVERGE_THRESHOLD = float(os.getenv("MAD_CONVERGE_THRESHOLD", "0.85"))
+
+
+def _prompt_fragments(s: DebateState) -> Dict[str, Any]:
+    """Per-debate invariant prompt fragments, computed once per example.
+
+    Every node previously rebuilt the choices CSV and the JSON example dicts
+    from scratch - 18+ identical joins per debate. Building them once and
+    stashing them in the state also guarantees the fragments stay
+    byte-identical across rounds, which is what provider-side prefix caches
+    key on.
+    """
+    frags = s.get('_frags')
+    if frags is None:
+        choice_keys = get_choice_keys(s['choices'])
+        uniform_prob = 1.0 / len(choice_keys)
+        frags = s['_frags'] = {
+            'choice_keys': choice_keys,
+            # Escaped variant guards against format-string issues in .format()
+            'choices_csv_escaped': ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k, v in s['choices'].items()]),
+            'choices_csv_plain': ", ".join([f"{k}) {v}" for k, v in s['choices'].items()]),
+            'choice_dict': ", ".join([f'"{k}": p{k}' for k in choice_keys]),
+            'reason_dict': ", ".join([f'"{k}": r{k}' for k in choice_keys]),
+            'judge_choice_dict': ", ".join([f'"{k}": float' for k in choice_keys]),
+            'uniform_dict': ", ".join([f'"{k}": {uniform_prob}' for k in choice_keys]),
+        }
+    return frags
+
 
 def _ask(model, system: str, user: str, choice_keys: list[str]) -> Dict[str, Any]:
     logger.info("Making debater API call...")
+    if getattr(model, "structured_output", None):
+        # Keep the enforced schema aligned with this example's answer space
+        # (mmlu has four choices, commonsenseqa five, qasc eight)
+        model.structured_output = tuple(choice_keys)
     max_retries = 3
     retry_delay = 2  # seconds
     
@@ -59,8 +114,49 @@ def _ask(model, system: str, user: str, choice_keys: list[str]) -> Dict[str, Any
         data["probs"] = {k: 1.0/len(choice_keys) for k in choice_keys}
     return data
 
+# The judge schema ends with NOTE_A/NOTE_B prose that parse_judge_json never
+# reads; once "CRIT_B": <number> has closed, everything downstream consumes is
+# already on the wire, so streaming judges stop generating there
+_JUDGE_STOP_RE = re.compile(r'"CRIT_B"\s*:\s*[\d.]+\s*[,}]')
+
+
 def _ask_judge(model, system: str, user: str, choice_keys: list[str]) -> Dict[str, Any]:
     logger.info("Making judge API call...")
+
+    # Streaming fast path: abort generation after CRIT_B instead of waiting
+    # for the full response (the unread NOTE fields are the longest part)
+    if hasattr(model, "invoke_stream"):
+        try:
+            resp = model.invoke_stream(
+                [
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                _JUDGE_STOP_RE,
+            )
+            content = getattr(resp, "content", "") or ""
+        except Exception as e:
+            logger.exception("Judge streaming call failed: %s", e)
+            content = ""
+        if content:
+            m = _JUDGE_STOP_RE.search(content)
+            if m:
+                # The stream usually carries partial text past the stop match
+                # (e.g. `, "NOTE_A": "som`); cut at the match and close the
+                # object the NOTE fields would have finished
+                head = content[: m.end()].rstrip()
+                if head.endswith(','):
+                    head = head[:-1] + '}'
+                elif not head.endswith('}'):
+                    head += '}'
+                content = head
+            data = parse_judge_json(content, choice_keys)
+            if any(data.get(k) is not None for k in ("outputA", "outputB", "CRIT_A", "CRIT_B")):
+                logger.debug("Judge parsed data (streamed): %s", json.dumps(data, indent=2, ensure_ascii=False))
+                return data
+            logger.warning("Streamed judge response did not parse; falling back to blocking call")
+        # Empty or unparseable stream: fall through to the blocking retry path below
+
     max_retries = 3
     retry_delay = 2  # seconds
     
@@ -157,6 +253,11 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
     else:
         pairing_config = cfg_models[pairing]
     
+    # Enforced structured output is opt-in per models.yaml debater entry
+    # (structured_output: true); _ask rebuilds the schema around each
+    # example's actual choice keys, so 5+-choice datasets stay answerable.
+    # The judge and researcher always keep free-form output - their schemas
+    # differ from the debate step.
     A = LLMFactory.make(**pairing_config['A'])
     B = LLMFactory.make(**pairing_config['B'])
     J = LLMFactory.make(**pairing_config['judge']) if with_judge else None
@@ -171,6 +272,15 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
 
     g = StateGraph(DebateState)
 
+    # Deferred judge futures live here, outside the graph state: Future
+    # objects hold thread locks a checkpointer's serializer cannot handle,
+    # and a resumed process could not reconstruct them anyway. Keyed by
+    # example id because one compiled graph serves many concurrent examples.
+    pending_judges: Dict[str, list] = {}
+
+    def _pending_key(s: DebateState) -> str:
+        return str(s.get('id', 'unknown'))
+
     def do_research(s: DebateState):
         """
         Mini-research agent that runs once before Round 1.
@@ -204,7 +314,18 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         )
         logger.debug("Mini-research prompt: %s", prompt)
 
-        research_text = _ask_research(R, sys_researcher, prompt)
+        cache_key = hashlib.blake2b(f"{sys_researcher}\n{prompt}".encode("utf-8")).hexdigest()
+        research_text = _research_cache.get(cache_key)
+        if research_text is None:
+            research_text = semantic_lookup(R, prompt)
+            if research_text is not None:
+                logger.info("Mini-research semantic cache hit for id=%s", s.get("id"))
+        if research_text is None:
+            research_text = _ask_research(R, sys_researcher, prompt)
+            if research_text:
+                semantic_store(R, prompt, research_text)
+        if research_text:
+            _research_cache[cache_key] = research_text
         s["research"] = research_text
         s["meta"]["research_used"] = True
         logger.info(
@@ -218,13 +339,11 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
     def start_A1(s: DebateState):
         s.setdefault('A', {}); s.setdefault('B', {})
         s['round_metrics'] = []
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        # Create dynamic JSON examples
-        choice_dict = ", ".join([f'"{k}": p{k}' for k in choice_keys])
-        reason_dict = ", ".join([f'"{k}": r{k}' for k in choice_keys])
-        # Escape curly braces in choices to prevent format string issues
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choice_dict = frags['choice_dict']
+        reason_dict = frags['reason_dict']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r1_A'].format(
             question=s['question'],
             choices_csv=choices_csv,
@@ -245,14 +364,11 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
             s.setdefault('crit', {}); s['crit'].setdefault('A', {}); s['crit'].setdefault('B', {})
             s['crit']['A']['r1'] = None; s['crit']['B']['r1'] = None
             return s
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        # Create dynamic JSON examples
-        choice_dict = ", ".join([f'"{k}": float' for k in choice_keys])
-        uniform_prob = 1.0 / len(choice_keys)
-        uniform_dict = ", ".join([f'"{k}": {uniform_prob}' for k in choice_keys])
-        # Escape curly braces in choices to prevent format string issues
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choice_dict = frags['judge_choice_dict']
+        uniform_dict = frags['uniform_dict']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_judge_r1'].format(
             question=s['question'], 
             choices_csv=choices_csv,
@@ -266,23 +382,18 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         )
         logger.info("=== ROUND 1 - JUDGE ===")
         logger.debug("Judge Round 1 prompt: %s", prompt)
-        resp = _ask_judge(J, s['sys_judge'], prompt, choice_keys)
-        logger.debug("Judge Round 1 response: %s", json.dumps(resp, indent=2, ensure_ascii=False))
         s.setdefault('crit', {}); s['crit'].setdefault('A', {}); s['crit'].setdefault('B', {})
-        s['crit']['A']['r1'] = resp.get('CRIT_A', None)
-        s['crit']['B']['r1'] = resp.get('CRIT_B', None)
-        rm = compute_round_metrics(s['A']['r1']['probs'], s['B']['r1']['probs'], None, None,
-                                   critA=s['crit']['A']['r1'], critB=s['crit']['B']['r1'])
-        s['round_metrics'].append({"round": 1, **rm})
+        future = _JUDGE_POOL.submit(_ask_judge, J, s['sys_judge'], prompt, choice_keys)
+        pending_judges.setdefault(_pending_key(s), []).append(
+            (1, future, s['A']['r1']['probs'], s['B']['r1']['probs'], None, None))
         return s
 
     def do_B1(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        # Create dynamic JSON examples
-        choice_dict = ", ".join([f'"{k}": p{k}' for k in choice_keys])
-        reason_dict = ", ".join([f'"{k}": r{k}' for k in choice_keys])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choice_dict = frags['choice_dict']
+        reason_dict = frags['reason_dict']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r1_B'].format(
             question=s['question'],
             choices_csv=choices_csv,
@@ -298,12 +409,11 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         return s
 
     def do_A2(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        # Create dynamic JSON examples
-        choice_dict = ", ".join([f'"{k}": p{k}' for k in choice_keys])
-        reason_dict = ", ".join([f'"{k}": r{k}' for k in choice_keys])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choice_dict = frags['choice_dict']
+        reason_dict = frags['reason_dict']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r2_A'].format(question=s['question'], choices_csv=choices_csv, B_json=s['B']['r1'], choice_dict=choice_dict, reason_dict=reason_dict)
         logger.info("=== ROUND 2 - AGENT A ===")
         logger.debug("Agent A Round 2 prompt: %s", prompt)
@@ -315,13 +425,11 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         if J is None:
             s['crit']['A']['r2'] = None; s['crit']['B']['r2'] = None
             return s
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        # Create dynamic JSON examples
-        choice_dict = ", ".join([f'"{k}": float' for k in choice_keys])
-        uniform_prob = 1.0 / len(choice_keys)
-        uniform_dict = ", ".join([f'"{k}": {uniform_prob}' for k in choice_keys])
-        choices_csv = ", ".join([f"{k}) {v}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choice_dict = frags['judge_choice_dict']
+        uniform_dict = frags['uniform_dict']
+        choices_csv = frags['choices_csv_plain']
         judge_prompt = s['u_judge_r2'].format(
             question=s['question'], 
             choices_csv=choices_csv,
@@ -335,29 +443,25 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         )
         logger.info("=== ROUND 2 - JUDGE ===")
         logger.debug("Judge Round 2 prompt: %s", judge_prompt)
-        resp = _ask_judge(J, s['sys_judge'], judge_prompt, choice_keys)
-        s['crit']['A']['r2'] = resp.get('CRIT_A', None)
-        s['crit']['B']['r2'] = resp.get('CRIT_B', None)
-        rm = compute_round_metrics(s['A']['r2']['probs'], s['B']['r2']['probs'], s['A']['r2']['probs'], s['B']['r1']['probs'],
-                                   critA=s['crit']['A']['r2'], critB=s['crit']['B']['r2'])
-        s['round_metrics'].append({"round": 2, **rm})
+        future = _JUDGE_POOL.submit(_ask_judge, J, s['sys_judge'], judge_prompt, choice_keys)
+        pending_judges.setdefault(_pending_key(s), []).append(
+            (2, future, s['A']['r2']['probs'], s['B']['r2']['probs'], s['A']['r2']['probs'], s['B']['r1']['probs']))
         return s
 
     def do_B2(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        # Create dynamic JSON examples
-        choice_dict = ", ".join([f'"{k}": p{k}' for k in choice_keys])
-        reason_dict = ", ".join([f'"{k}": r{k}' for k in choice_keys])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choice_dict = frags['choice_dict']
+        reason_dict = frags['reason_dict']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r2_B'].format(question=s['question'], choices_csv=choices_csv, A_json=s['A']['r2'], choice_dict=choice_dict, reason_dict=reason_dict)
         s['B']['r2'] = _ask(B, s['sys_debater'], prompt, choice_keys)
         return s
 
     def do_A3(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r3_A'].format(question=s['question'], choices_csv=choices_csv, B_json=s['B']['r2'])
         logger.info("=== ROUND 3 - AGENT A ===")
         logger.debug("Agent A Round 3 prompt: %s", prompt)
@@ -369,9 +473,9 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         if J is None:
             s['crit']['A']['r3'] = None; s['crit']['B']['r3'] = None
             return s
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {v}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_plain']
         prompt = s['u_judge_r3'].format(
             question=s['question'], 
             choices_csv=choices_csv,
@@ -383,19 +487,15 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         )
         logger.info("=== ROUND 3 - JUDGE ===")
         logger.debug("Judge Round 3 prompt: %s", prompt)
-        resp = _ask_judge(J, s['sys_judge'], prompt, choice_keys)
-        logger.debug("Judge Round 3 response: %s", json.dumps(resp, indent=2, ensure_ascii=False))
-        s['crit']['A']['r3'] = resp.get('CRIT_A', None)
-        s['crit']['B']['r3'] = resp.get('CRIT_B', None)
-        rm = compute_round_metrics(s['A']['r3']['probs'], s['B']['r3']['probs'], s['A']['r2']['probs'], s['B']['r2']['probs'],
-                                   critA=s['crit']['A']['r3'], critB=s['crit']['B']['r3'])
-        s['round_metrics'].append({"round": 3, **rm})
+        future = _JUDGE_POOL.submit(_ask_judge, J, s['sys_judge'], prompt, choice_keys)
+        pending_judges.setdefault(_pending_key(s), []).append(
+            (3, future, s['A']['r3']['probs'], s['B']['r3']['probs'], s['A']['r2']['probs'], s['B']['r2']['probs']))
         return s
 
     def do_B3(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r3_B'].format(question=s['question'], choices_csv=choices_csv, A_json=s['A']['r3'])
         logger.info("=== ROUND 3 - AGENT B ===")
         logger.debug("Agent B Round 3 prompt: %s", prompt)
@@ -404,9 +504,9 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         return s
 
     def do_A4(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r4_A'].format(question=s['question'], choices_csv=choices_csv, B_json=s['B']['r3'])
         logger.info("=== ROUND 4 - AGENT A ===")
         logger.debug("Agent A Round 4 prompt: %s", prompt)
@@ -418,9 +518,9 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         if J is None:
             s['crit']['A']['r4'] = None; s['crit']['B']['r4'] = None
             return s
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {v}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_plain']
         prompt = s['u_judge_r4'].format(
             question=s['question'], 
             choices_csv=choices_csv,
@@ -432,19 +532,15 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         )
         logger.info("=== ROUND 4 - JUDGE ===")
         logger.debug("Judge Round 4 prompt: %s", prompt)
-        resp = _ask_judge(J, s['sys_judge'], prompt, choice_keys)
-        logger.debug("Judge Round 4 response: %s", json.dumps(resp, indent=2, ensure_ascii=False))
-        s['crit']['A']['r4'] = resp.get('CRIT_A', None)
-        s['crit']['B']['r4'] = resp.get('CRIT_B', None)
-        rm = compute_round_metrics(s['A']['r4']['probs'], s['B']['r4']['probs'], s['A']['r3']['probs'], s['B']['r3']['probs'],
-                                   critA=s['crit']['A']['r4'], critB=s['crit']['B']['r4'])
-        s['round_metrics'].append({"round": 4, **rm})
+        future = _JUDGE_POOL.submit(_ask_judge, J, s['sys_judge'], prompt, choice_keys)
+        pending_judges.setdefault(_pending_key(s), []).append(
+            (4, future, s['A']['r4']['probs'], s['B']['r4']['probs'], s['A']['r3']['probs'], s['B']['r3']['probs']))
         return s
 
     def do_B4(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r4_B'].format(question=s['question'], choices_csv=choices_csv, A_json=s['A']['r4'])
         logger.info("=== ROUND 4 - AGENT B ===")
         logger.debug("Agent B Round 4 prompt: %s", prompt)
@@ -453,9 +549,9 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         return s
 
     def do_A5(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r5_A'].format(question=s['question'], choices_csv=choices_csv, B_json=s['B']['r4'])
         logger.info("=== ROUND 5 - AGENT A ===")
         logger.debug("Agent A Round 5 prompt: %s", prompt)
@@ -467,9 +563,9 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         if J is None:
             s['crit']['A']['r5'] = None; s['crit']['B']['r5'] = None
             return s
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {v}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_plain']
         prompt = s['u_judge_r5'].format(
             question=s['question'], 
             choices_csv=choices_csv,
@@ -481,19 +577,15 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         )
         logger.info("=== ROUND 5 - JUDGE ===")
         logger.debug("Judge Round 5 prompt: %s", prompt)
-        resp = _ask_judge(J, s['sys_judge'], prompt, choice_keys)
-        logger.debug("Judge Round 5 response: %s", json.dumps(resp, indent=2, ensure_ascii=False))
-        s['crit']['A']['r5'] = resp.get('CRIT_A', None)
-        s['crit']['B']['r5'] = resp.get('CRIT_B', None)
-        rm = compute_round_metrics(s['A']['r5']['probs'], s['B']['r5']['probs'], s['A']['r4']['probs'], s['B']['r4']['probs'],
-                                   critA=s['crit']['A']['r5'], critB=s['crit']['B']['r5'])
-        s['round_metrics'].append({"round": 5, **rm})
+        future = _JUDGE_POOL.submit(_ask_judge, J, s['sys_judge'], prompt, choice_keys)
+        pending_judges.setdefault(_pending_key(s), []).append(
+            (5, future, s['A']['r5']['probs'], s['B']['r5']['probs'], s['A']['r4']['probs'], s['B']['r4']['probs']))
         return s
 
     def do_B5(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r5_B'].format(question=s['question'], choices_csv=choices_csv, A_json=s['A']['r5'])
         logger.info("=== ROUND 5 - AGENT B ===")
         logger.debug("Agent B Round 5 prompt: %s", prompt)
@@ -502,9 +594,9 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         return s
 
     def do_A6(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r6_A'].format(question=s['question'], choices_csv=choices_csv, A_json=s['A']['r5'], B_json=s['B']['r5'])
         logger.info("=== ROUND 6 (FINAL) - AGENT A ===")
         logger.debug("Agent A Round 6 prompt: %s", prompt)
@@ -516,9 +608,9 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         if J is None:
             s['crit']['A']['r6'] = None; s['crit']['B']['r6'] = None
             return s
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {v}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_plain']
         prompt = s['u_judge_r6'].format(
             question=s['question'], 
             choices_csv=choices_csv,
@@ -530,19 +622,15 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         )
         logger.info("=== ROUND 6 (FINAL) - JUDGE ===")
         logger.debug("Judge Round 6 prompt: %s", prompt)
-        resp = _ask_judge(J, s['sys_judge'], prompt, choice_keys)
-        logger.debug("Judge Round 6 response: %s", json.dumps(resp, indent=2, ensure_ascii=False))
-        s['crit']['A']['r6'] = resp.get('CRIT_A', None)
-        s['crit']['B']['r6'] = resp.get('CRIT_B', None)
-        rm = compute_round_metrics(s['A']['r6']['probs'], s['B']['r6']['probs'], s['A']['r5']['probs'], s['B']['r5']['probs'],
-                                   critA=s['crit']['A']['r6'], critB=s['crit']['B']['r6'])
-        s['round_metrics'].append({"round": 6, **rm})
+        future = _JUDGE_POOL.submit(_ask_judge, J, s['sys_judge'], prompt, choice_keys)
+        pending_judges.setdefault(_pending_key(s), []).append(
+            (6, future, s['A']['r6']['probs'], s['B']['r6']['probs'], s['A']['r5']['probs'], s['B']['r5']['probs']))
         return s
 
     def do_B6(s: DebateState):
-        # Get choice keys dynamically
-        choice_keys = get_choice_keys(s['choices'])
-        choices_csv = ", ".join([f"{k}) {str(v).replace('{', '{{').replace('}', '}}')}" for k,v in s['choices'].items()])
+        frags = _prompt_fragments(s)
+        choice_keys = frags['choice_keys']
+        choices_csv = frags['choices_csv_escaped']
         prompt = s['u_r6_B'].format(question=s['question'], choices_csv=choices_csv, B_json=s['B']['r5'], A_json=s['A']['r5'])
         logger.info("=== ROUND 6 (FINAL) - AGENT B ===")
         logger.debug("Agent B Round 6 prompt: %s", prompt)
@@ -551,17 +639,45 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
         return s
 
     def final_judge(s: DebateState):
+        s.pop('_frags', None)  # internal scratch; keep it out of saved results
+        # Barrier: resolve the judge calls that ran concurrently with later
+        # rounds, in round order, before the final verdict reads crit scores
+        for round_no, future, pa, pb, prev_pa, prev_pb in pending_judges.pop(_pending_key(s), []):
+            resp = future.result()
+            logger.debug("Judge Round %s response: %s", round_no, json.dumps(resp, indent=2, ensure_ascii=False))
+            s['crit']['A'][f'r{round_no}'] = resp.get('CRIT_A', None)
+            s['crit']['B'][f'r{round_no}'] = resp.get('CRIT_B', None)
+            rm = compute_round_metrics(pa, pb, prev_pa, prev_pb,
+                                       critA=s['crit']['A'][f'r{round_no}'],
+                                       critB=s['crit']['B'][f'r{round_no}'])
+            s['round_metrics'].append({"round": round_no, **rm})
+
+        # The debate may have finished early on convergence, so read the last
+        # round both agents actually completed rather than hard-coding r6
+        last = max(int(k[1:]) for k in s['A'] if k.startswith('r') and k in s['B'])
+        fa = s['A'][f'r{last}']['probs']; fb = s['B'][f'r{last}']['probs']
+        fp = {k: 0.5*(fa[k]+fb[k]) for k in fa}
         if J is None:
-            fa = s['A']['r6']['probs']; fb = s['B']['r6']['probs']
-            fp = {k: 0.5*(fa[k]+fb[k]) for k in fa}
-            s['final'] = {"probs": fp, "notes": "mean(A6,B6); judge disabled"}
+            s['final'] = {"probs": fp, "notes": f"mean(A{last},B{last}); judge disabled"}
             return s
         # Use the final round probabilities and CRIT scores for final judgment
-        fa = s['A']['r6']['probs']; fb = s['B']['r6']['probs']
-        fp = {k: 0.5*(fa[k]+fb[k]) for k in fa}
-        s['final'] = {"probs": fp, "notes": f"mean(A6,B6); CRIT_A={s['crit']['A']['r6']}, CRIT_B={s['crit']['B']['r6']}"}
+        s['final'] = {"probs": fp, "notes": f"mean(A{last},B{last}); CRIT_A={s['crit']['A'].get(f'r{last}')}, CRIT_B={s['crit']['B'].get(f'r{last}')}"}
         return s
 
+    def _converged(s: DebateState, round_no: int) -> bool:
+        pa = s['A'][f'r{round_no}']['probs']; pb = s['B'][f'r{round_no}']['probs']
+        top_a = max(pa, key=pa.get); top_b = max(pb, key=pb.get)
+        return top_a == top_b and pa[top_a] >= CONVERGE_THRESHOLD and pb[top_b] >= CONVERGE_THRESHOLD
+
+    def _route_after_judge(round_no: int, next_node: str):
+        # Router only - the convergence check must not mutate state
+        def route(s: DebateState) -> str:
+            if _converged(s, round_no):
+                logger.info("Agents converged after round %s; skipping to FinalJudge", round_no)
+                return "FinalJudge"
+            return next_node
+        return route
+
     # Add all nodes
     g.add_node("Research", do_research)
     g.add_node("A1", start_A1)
@@ -595,13 +711,16 @@ def build_graph(cfg_prompts, cfg_models, pairing, with_judge: bool=True):
     g.add_edge("Judge2", "A3")
     g.add_edge("A3", "B3")
     g.add_edge("B3", "Judge3")
-    g.add_edge("Judge3", "A4")
+    g.add_conditional_edges("Judge3", _route_after_judge(3, "A4"),
+                            {"A4": "A4", "FinalJudge": "FinalJudge"})
     g.add_edge("A4", "B4")
     g.add_edge("B4", "Judge4")
-    g.add_edge("Judge4", "A5")
+    g.add_conditional_edges("Judge4", _route_after_judge(4, "A5"),
+                            {"A5": "A5", "FinalJudge": "FinalJudge"})
     g.add_edge("A5", "B5")
     g.add_edge("B5", "Judge5")
-    g.add_edge("Judge5", "A6")
+    g.add_conditional_edges("Judge5", _route_after_judge(5, "A6"),
+                            {"A6": "A6", "FinalJudge": "FinalJudge"})
     g.add_edge("A6", "B6")
     g.add_edge("B6", "Judge6")
     g.add_edge("Judge6", "FinalJudge")
@@ -1,7 +1,13 @@
 """
 Model wrappers for different AI providers
 """
+import functools
+import hashlib
 import os
+import random
+import threading
+import time
+from concurrent.futures import Future
 from typing import Dict, Any, Optional
 import json
 import requests
@@ -32,53 +38,177 @@ try:
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
 
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json_body(data) -> bytes:
+    """Serialize a request payload once, with orjson when available.
+
+    Passing pre-serialized bytes instead of `json=data` keeps requests'
+    (slower) stdlib serialization off the per-call hot path and avoids
+    re-encoding the payload on retries.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=256)
+def _encode_cached(text: str, model: str) -> tuple:
+    """Token IDs for `text`, memoized so repeated texts tokenize once."""
+    try:
+        enc = tiktoken.encoding_for_model(model)
+    except KeyError:
+        enc = tiktoken.get_encoding("cl100k_base")
+    return tuple(enc.encode(text))
+
+
+def count_tokens(text: str, model: str = "gpt-4o", prefix: str = "") -> int:
+    """Estimate the token count of `prefix + text`.
+
+    Pass the invariant part of a prompt (system message + question header) as
+    `prefix`: its encoding is cached, so the 12 calls per debate tokenize it
+    once instead of re-encoding the same ~1KB every round. Without tiktoken
+    this falls back to a rough 4-chars-per-token heuristic.
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return (len(prefix) + len(text)) // 4
+    n = len(_encode_cached(prefix, model)) if prefix else 0
+    return n + len(_encode_cached(text, model))
+
+# JSON schema for one debate step. Providers with enforced structured output
+# use this so the answer/probs can't come back as malformed free text (which
+# previously forced parse retries or broken examples downstream). The schema is
+# built per choice set - datasets range from 4 choices (mmlu) to 8 (qasc) and
+# hard-coding A-D would structurally forbid the model from answering E+.
+@functools.lru_cache(maxsize=None)
+def debate_step_schema(choice_keys: tuple) -> dict:
+    keys = list(choice_keys)
+    return {
+        "type": "object",
+        "properties": {
+            "final_answer": {"type": "string", "enum": keys},
+            "probs": {
+                "type": "object",
+                "properties": {k: {"type": "number"} for k in keys},
+                "required": keys,
+                # strict mode requires closed objects with every key present
+                "additionalProperties": False,
+            },
+            "justification": {"type": "string"},
+        },
+        "required": ["final_answer", "probs", "justification"],
+        "additionalProperties": False,
+    }
+
+
+def _schema_choice_keys(flag) -> tuple:
+    """Normalize a structured_output flag (True or a choice-key sequence)."""
+    if flag is True:
+        return ("A", "B", "C", "D")
+    return tuple(flag)
+
 class BaseModel:
     """Base class for model wrappers"""
-    
+
     def __init__(self, provider: str, model: str, temperature: float = 0.3, max_tokens: int = 1024):
         self.provider = provider
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
-    
+        # Truthy values make providers that support it enforce the debate-step
+        # schema on the output (OpenAI json_schema strict mode / Anthropic
+        # forced tool use). Either True (A-D) or the choice-key sequence the
+        # schema should cover; graph._ask refreshes it per example.
+        self.structured_output = False
+
     def invoke(self, messages: list) -> Any:
         """Invoke the model with messages"""
         raise NotImplementedError
 
+# One SDK client per provider, shared by every model instance. Each OpenAI /
+# Anthropic client owns its own connection pool; constructing one per model
+# meant separate pools (and fresh TLS handshakes) for agents that talk to the
+# same endpoint. Keyed on the API key so different keys still get their own
+# client.
+_provider_clients: dict = {}
+
+
+def _shared_client(provider: str, api_key: str, factory):
+    key = (provider, api_key)
+    client = _provider_clients.get(key)
+    if client is None:
+        client = _provider_clients[key] = factory()
+    return client
+
+
 class OpenAIModel(BaseModel):
     """OpenAI model wrapper"""
-    
+
     def __init__(self, model: str, temperature: float = 0.3, max_tokens: int = 1024):
         super().__init__("openai", model, temperature, max_tokens)
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI library not available. Install with: pip install openai")
-        
+
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
-        
-        self.client = OpenAI(api_key=api_key)
+
+        self.client = _shared_client("openai", api_key, lambda: OpenAI(api_key=api_key))
     
     def invoke(self, messages: list) -> Any:
         """Invoke OpenAI model"""
         try:
+            kwargs = {}
+            if self.structured_output:
+                # strict=True is what turns the schema from advisory into
+                # constrained decoding
+                kwargs["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "DebateStep",
+                        "schema": debate_step_schema(_schema_choice_keys(self.structured_output)),
+                        "strict": True,
+                    },
+                }
             # For some models, temperature is not supported, so we omit it
             try:
                 response = self.client.chat.completions.create(
                     model=self.model,
                     messages=messages,
                     temperature=self.temperature,
-                    max_completion_tokens=self.max_tokens
+                    max_completion_tokens=self.max_tokens,
+                    **kwargs
                 )
             except Exception as e:
                 if "temperature" in str(e).lower():
                     response = self.client.chat.completions.create(
                         model=self.model,
                         messages=messages,
-                        max_completion_tokens=self.max_tokens
+                        max_completion_tokens=self.max_tokens,
+                        **kwargs
                     )
                 else:
                     raise
+            # OpenAI caches byte-identical prompt prefixes automatically; report
+            # hits so the cached-prefix structure can be verified
+            usage = getattr(response, "usage", None)
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", 0) or 0
+            if cached_tokens:
+                print(f"   ♻️ Prompt cache hit: {cached_tokens} input tokens served from cache")
             return response.choices[0].message
         except Exception as e:
             print(f"OpenAI API error: {e}")
@@ -96,7 +226,7 @@ class AnthropicModel(BaseModel):
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable not set")
         
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = _shared_client("anthropic", api_key, lambda: anthropic.Anthropic(api_key=api_key))
     
     def invoke(self, messages: list) -> Any:
         """Invoke Anthropic model"""
@@ -111,13 +241,34 @@ class AnthropicModel(BaseModel):
                 elif msg["role"] == "user":
                     user_msg = msg["content"]
             
+            # Mark the invariant system prompt as cacheable so repeated calls
+            # reuse the server-side prefix instead of re-processing it
+            if system_msg:
+                system_param = [{"type": "text", "text": system_msg, "cache_control": {"type": "ephemeral"}}]
+            else:
+                system_param = system_msg
+            kwargs = {}
+            if self.structured_output:
+                # Anthropic has no json_schema response format; forcing a tool
+                # call with the schema as input is the closest equivalent
+                kwargs["tools"] = [{
+                    "name": "submit_answer",
+                    "description": "Submit the final answer, probabilities, and justification for this debate step.",
+                    "input_schema": debate_step_schema(_schema_choice_keys(self.structured_output)),
+                }]
+                kwargs["tool_choice"] = {"type": "tool", "name": "submit_answer"}
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                system=system_msg,
-                messages=[{"role": "user", "content": user_msg}]
+                system=system_param,
+                messages=[{"role": "user", "content": user_msg}],
+                **kwargs
             )
+            if self.structured_output:
+                for block in response.content:
+                    if getattr(block, "type", None) == "tool_use":
+                        return type('MockResponse', (), {'content': json.dumps(block.input, ensure_ascii=False)})
             return type('MockResponse', (), {'content': response.content[0].text})
         except Exception as e:
             print(f"Anthropic API error: {e}")
@@ -285,9 +436,25 @@ class LocalModel(BaseModel):
             print(f"Local model error: {e}")
             return type('MockResponse', (), {'content': '{"output": {"A": 0.25, "B": 0.25, "C": 0.25, "D": 0.25}, "reason": {"A": "Error", "B": "Error", "C": "Error", "D": "Error"}}'})
 
+# One keep-alive connection pool shared by every LitGPT wrapper. Without it
+# each wrapper owns its own session and concurrent debates pay a fresh TCP
+# setup per endpoint; with a shared pool the 12 calls per debate (and parallel
+# debates in run_batch) reuse warm connections.
+SHARED_SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=64)
+SHARED_SESSION.mount("http://", _adapter)
+SHARED_SESSION.mount("https://", _adapter)
+
+# In-flight coalescing for byte-identical litgpt requests: concurrent workers
+# (or retry storms) that issue the same deterministic payload share one HTTP
+# call instead of double-paying the server. Only applies at temperature == 0,
+# where identical payloads are supposed to yield identical completions.
+_LITGPT_INFLIGHT: dict = {}
+_LITGPT_INFLIGHT_LOCK = threading.Lock()
+
 class LitGPTModel(BaseModel):
     """Model wrapper for litgpt API endpoints"""
-    
+
     def __init__(self, model: str, temperature: float = 0.3, max_tokens: int = 1024):
         super().__init__("litgpt", model, temperature, max_tokens)
         # Extract port from model string (e.g., "8000" -> "http://localhost:8000")
@@ -295,37 +462,219 @@ class LitGPTModel(BaseModel):
             self.base_url = f"http://localhost:{model}"
         else:
             self.base_url = model.rstrip('/')
-        self.session = requests.Session()
-    
+        self.session = SHARED_SESSION
+        # Server-side system-prompt pinning (sticky sessions). The system message
+        # is identical for every round, so register it once and reference it by
+        # session_id instead of resending it in every request body.
+        self._session_id = None
+        self._pinned_system = None
+        self._session_pinning_unsupported = False
+        self._batch_unsupported = False
+
+    def _ensure_session_id(self, system_text):
+        """Register the system prompt once with the server and reuse the session_id.
+
+        Returns the session_id, or None if the server doesn't support sessions.
+        """
+        if self._session_pinning_unsupported:
+            return None
+        if self._session_id is not None and self._pinned_system == system_text:
+            return self._session_id
+        try:
+            response = self.session.post(
+                f"{self.base_url}/v1/sessions",
+                json={"system": system_text},
+                timeout=10
+            )
+            if response.status_code == 200:
+                session_id = response.json().get("session_id")
+                if session_id:
+                    self._session_id = session_id
+                    self._pinned_system = system_text
+                    print(f"   📌 Pinned system prompt server-side (session_id: {session_id})")
+                    return session_id
+        except Exception:
+            pass
+        # Server ignores/rejects sessions - fall back and don't retry every call
+        self._session_pinning_unsupported = True
+        return None
+
+    # Transient failures worth retrying: rate limiting and server-side errors.
+    # 4xx client errors (bad request, auth) are returned immediately.
+    RETRIABLE_STATUS = (429, 500, 502, 503, 504)
+    MAX_RETRIES = 6
+
+    def _post_with_retry(self, url, data):
+        """POST with exponential backoff + jitter on transient failures.
+
+        Timeouts, connection errors, and 429/5xx responses are retried up to
+        MAX_RETRIES times with a capped, jittered exponential delay so a single
+        transient blip doesn't waste an entire multi-round debate. The final
+        failure propagates to the caller's existing error handling.
+        """
+        body = _json_body(data)
+        delay = 1.0
+        for attempt in range(self.MAX_RETRIES):
+            last_attempt = attempt == self.MAX_RETRIES - 1
+            try:
+                response = self.session.post(url, data=body, headers=_JSON_HEADERS, timeout=300)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                if last_attempt:
+                    raise
+                print(f"   ⚠️ Request failed ({e}), retrying in ~{delay:.1f}s (attempt {attempt + 1}/{self.MAX_RETRIES})")
+            else:
+                if response.status_code not in self.RETRIABLE_STATUS or last_attempt:
+                    return response
+                print(f"   ⚠️ Transient HTTP {response.status_code}, retrying in ~{delay:.1f}s (attempt {attempt + 1}/{self.MAX_RETRIES})")
+            time.sleep(delay + random.uniform(0, delay))
+            delay = min(delay * 2, 60)
+        return response
+
+    def _build_payload(self, messages):
+        """Build the /predict request body (with server-side session pinning when available)."""
+        session_id = None
+        if len(messages) == 2 and messages[0]["role"] == "system":
+            # System + user message; try to pin the system prompt server-side
+            # so only the user content travels per call
+            session_id = self._ensure_session_id(messages[0]["content"])
+            if session_id:
+                prompt = messages[1]["content"]
+            else:
+                prompt = f"{messages[0]['content']}\n\n{messages[1]['content']}"
+        else:
+            # Just user message or other format
+            prompt = messages[-1]["content"]
+
+        data = {
+            "prompt": prompt,
+            "max_new_tokens": max(self.max_tokens, 16384),  # Increased to 16384 to match server limit
+            "temperature": self.temperature,
+            "top_p": 0.9,
+            "top_k": 50
+        }
+        if session_id:
+            data["session_id"] = session_id
+        return data
+
+    def invoke_batch(self, messages_list):
+        """Send many independent prompts in one /batch_predict request.
+
+        Server-side batching lets the backend schedule all prompts together
+        instead of paying one HTTP round-trip per prompt. Falls back to
+        sequential invoke calls (once, permanently) if the server doesn't
+        expose the endpoint.
+        """
+        # Batch requests bypass session pinning: /batch_predict has no
+        # per-prompt session_id field, so stripping the system message the way
+        # _build_payload does would send these prompts with no system prompt
+        # at all. Concatenate system + user inline instead.
+        def _full_prompt(messages):
+            if len(messages) == 2 and messages[0]["role"] == "system":
+                return f"{messages[0]['content']}\n\n{messages[1]['content']}"
+            return messages[-1]["content"]
+
+        if not self._batch_unsupported:
+            try:
+                data = {
+                    "prompts": [_full_prompt(m) for m in messages_list],
+                    "max_new_tokens": max(self.max_tokens, 16384),
+                    "temperature": self.temperature,
+                    "top_p": 0.9,
+                    "top_k": 50
+                }
+                response = self._post_with_retry(f"{self.base_url}/batch_predict", data)
+                if response.status_code == 200:
+                    outputs = response.json().get("outputs", [])
+                    if len(outputs) == len(messages_list):
+                        return [type('MockResponse', (), {'content': o}) for o in outputs]
+                    print(f"   ⚠️ /batch_predict returned {len(outputs)} outputs for {len(messages_list)} prompts")
+            except Exception as e:
+                print(f"LitGPT batch call failed: {e}")
+            self._batch_unsupported = True
+            print("   ⚠️ /batch_predict unavailable, falling back to per-prompt calls")
+        return [self.invoke(m) for m in messages_list]
+
+    def invoke_stream(self, messages, stop_re=None):
+        """Stream tokens from /predict and abort generation once `stop_re` matches.
+
+        Useful when downstream only needs the head of the response (e.g. the
+        final round, where scoring reads just the answer letter and probs):
+        closing the connection early stops the server from generating the
+        remaining justification tokens. Falls back to a regular invoke if the
+        server doesn't stream.
+        """
+        try:
+            data = self._build_payload(messages)
+            data["stream"] = True
+            response = self.session.post(f"{self.base_url}/predict", data=_json_body(data), headers=_JSON_HEADERS, timeout=300, stream=True)
+            if response.status_code != 200:
+                response.close()
+                return self.invoke(messages)
+            if "application/json" in response.headers.get("content-type", ""):
+                # Server ignored the stream flag and sent one JSON blob
+                result = response.json()
+                return type('MockResponse', (), {'content': result.get("output", str(result))})
+
+            buffer = ""
+            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                if not chunk:
+                    continue
+                buffer += chunk
+                if stop_re is not None and stop_re.search(buffer):
+                    print(f"   ✂️ Early stop: answer parsed after {len(buffer)} chars, aborting generation")
+                    response.close()
+                    break
+            return type('MockResponse', (), {'content': buffer})
+        except Exception as e:
+            print(f"LitGPT streaming call failed, falling back to invoke: {e}")
+            return self.invoke(messages)
+
     def invoke(self, messages):
+        """Send request to litgpt API endpoint, coalescing identical in-flight calls."""
+        if self.temperature != 0:
+            return self._invoke_uncoalesced(messages)
+
+        payload = self._build_payload(messages)
+        key = hashlib.sha256(
+            json.dumps({"url": self.base_url, "data": payload}, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        with _LITGPT_INFLIGHT_LOCK:
+            future = _LITGPT_INFLIGHT.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                _LITGPT_INFLIGHT[key] = future
+        if not leader:
+            # Response objects are read-only (.content), so followers can
+            # safely share the leader's result
+            return future.result()
+        try:
+            response = self._invoke_uncoalesced(messages)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _LITGPT_INFLIGHT_LOCK:
+                _LITGPT_INFLIGHT.pop(key, None)
+
+    def _invoke_uncoalesced(self, messages):
         """Send request to litgpt API endpoint"""
         try:
-            # Convert messages to litgpt format
-            if len(messages) == 2 and messages[0]["role"] == "system":
-                # System + user message
-                prompt = f"{messages[0]['content']}\n\n{messages[1]['content']}"
-            else:
-                # Just user message or other format
-                prompt = messages[-1]["content"]
-            
             # Use the correct litgpt API structure: /predict endpoint
             url = f"{self.base_url}/predict"
-            data = {
-                "prompt": prompt,
-                "max_new_tokens": max(self.max_tokens, 16384),  # Increased to 16384 to match server limit
-                "temperature": self.temperature,
-                "top_p": 0.9,
-                "top_k": 50
-            }
-            
+            data = self._build_payload(messages)
+            prompt = data["prompt"]
+
             print(f"   🔧 Debug: self.temperature = {self.temperature}, self.max_tokens = {self.max_tokens}")
             
             print(f"   Sending request to: {url}")
             print(f"   Prompt: {prompt[:100]}...")
             print(f"   Request data: {data}")
             
-            # Send the POST request
-            response = self.session.post(url, json=data, timeout=300)  # Increased timeout for longer responses
+            # Send the POST request (transient failures retried with backoff)
+            response = self._post_with_retry(url, data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -395,17 +744,26 @@ class LLMFactory:
     """Factory for creating model instances"""
     
     @staticmethod
-    def make(provider: str, model: str, temperature: float = 0.3, max_tokens: int = 1024) -> BaseModel:
-        """Create a model instance based on provider"""
+    def make(provider: str, model: str, temperature: float = 0.3, max_tokens: int = 1024,
+             structured_output: bool = False) -> BaseModel:
+        """Create a model instance based on provider.
+
+        `structured_output` (opt-in; True or a choice-key sequence) enforces
+        the debate-step schema on providers that support it (OpenAI strict
+        json_schema mode, Anthropic forced tool use); other providers ignore
+        the flag.
+        """
         if provider == "openai":
-            return OpenAIModel(model, temperature, max_tokens)
+            instance = OpenAIModel(model, temperature, max_tokens)
         elif provider == "anthropic":
-            return AnthropicModel(model, temperature, max_tokens)
+            instance = AnthropicModel(model, temperature, max_tokens)
         elif provider == "google":
-            return GoogleModel(model, temperature, max_tokens)
+            instance = GoogleModel(model, temperature, max_tokens)
         elif provider == "local":
-            return LocalModel(model, temperature, max_tokens)
+            instance = LocalModel(model, temperature, max_tokens)
         elif provider == "litgpt":
-            return LitGPTModel(model, temperature, max_tokens)
+            instance = LitGPTModel(model, temperature, max_tokens)
         else:
             raise ValueError(f"Unsupported provider: {provider}")
+        instance.structured_output = structured_output
+        return instance
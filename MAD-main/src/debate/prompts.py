@@ -1,10 +1,36 @@
 # src/debate/prompts.py
 from __future__ import annotations
 import json
+import re
 from typing import Dict, Any, Optional, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 EPS = 1e-9
 
+
+def _loads(text: str):
+    """Parse a JSON document with the fastest available parser.
+
+    Every agent and judge message passes through here once per round, so the
+    compiled orjson parser is used when installed; stdlib json otherwise.
+    """
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
+# -----------------------------
+# Precompiled response patterns
+# -----------------------------
+# Compiled once at module scope and shared across all rounds/examples; these are
+# anchored to their section headers (no `.*` over the whole content) to avoid
+# catastrophic backtracking on long model outputs.
+_ANSWER_RE = re.compile(r'Final Answer:\s*\**\s*([ABCD])', re.IGNORECASE)
+_PROBS_RE = re.compile(r'Probs:\s*(\{[^}]*\})', re.DOTALL)
+_JUST_RE = re.compile(r'Justification:\s*(.+?)(?=\n\n|\Z)', re.DOTALL)
+
 def get_choice_keys(choices: Dict[str, Any]) -> list[str]:
     """Extract choice keys from choices dict (e.g., ['A', 'B', 'C', 'D'] or ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H'])"""
     if 'label' in choices:
@@ -79,7 +105,7 @@ def parse_json_or_fallback(text: str, choice_keys: list[str]) -> Dict[str, Any]:
     }
 
     try:
-        obj = json.loads(text)
+        obj = _loads(text)
         # print(f"JSON PARSE SUCCESS: {obj}")
     except Exception as e:
         # print(f"JSON PARSE FAILED: {e}")
@@ -92,6 +118,18 @@ def parse_json_or_fallback(text: str, choice_keys: list[str]) -> Dict[str, Any]:
             "rationale": json.dumps(obj, ensure_ascii=False),
         }
 
+    # Enforced structured output (debate_step_schema)
+    if "final_answer" in obj and isinstance(obj.get("probs"), dict):
+        justification = str(obj.get("justification", "") or "")
+        letter = str(obj.get("final_answer", "")).upper()
+        return {
+            "probs": normalize_probs(obj["probs"], choice_keys),
+            "rationale": justification,
+            # Judge prompts read per-choice reasons; attach the justification
+            # to the chosen answer
+            "reasons": {letter: justification} if letter in choice_keys and justification else {},
+        }
+
     # New strict schema
     if "output" in obj or "reason" in obj:
         # print("USING NEW STRICT SCHEMA")
@@ -131,6 +169,69 @@ def parse_json_or_fallback(text: str, choice_keys: list[str]) -> Dict[str, Any]:
         "rationale": json.dumps(obj, ensure_ascii=False),
     }
 
+def parse_debate_response(text: str, choice_keys: list[str]) -> Dict[str, Any]:
+    """
+    Parse a free-text debater response in the round format:
+
+        1. Your Final Answer: A/B/C/D
+        2. Probs: {"A": pA, "B": pB, "C": pC, "D": pD}
+        3. Justification: up to 5 sentences...
+
+    Uses the precompiled module-level patterns so repeated rounds don't pay
+    pattern-compilation cost.
+
+    Returns:
+      {
+        "answer": str | None,             # matched letter, if present
+        "probs": Dict[str, float],        # normalized; uniform fallback
+        "justification": str,             # may be empty
+      }
+    """
+    out = {
+        "answer": None,
+        "probs": {k: 1.0 / len(choice_keys) for k in choice_keys},
+        "justification": "",
+    }
+    if not text:
+        return out
+
+    # Structured-output responses (debate_step_schema) arrive as enforced JSON
+    # and need no regex scraping
+    if text.lstrip().startswith("{"):
+        try:
+            obj = _loads(text)
+        except Exception:
+            obj = None
+        if isinstance(obj, dict) and "final_answer" in obj:
+            letter = str(obj.get("final_answer", "")).upper()
+            if letter in choice_keys:
+                out["answer"] = letter
+            if isinstance(obj.get("probs"), dict):
+                out["probs"] = normalize_probs(obj["probs"], choice_keys)
+            out["justification"] = str(obj.get("justification", "") or "")
+            return out
+
+    m = _ANSWER_RE.search(text)
+    if m:
+        letter = m.group(1).upper()
+        if letter in choice_keys:
+            out["answer"] = letter
+
+    m = _PROBS_RE.search(text)
+    if m:
+        try:
+            probs = _loads(m.group(1))
+            if isinstance(probs, dict):
+                out["probs"] = normalize_probs(probs, choice_keys)
+        except Exception:
+            pass
+
+    m = _JUST_RE.search(text)
+    if m:
+        out["justification"] = m.group(1).strip()
+
+    return out
+
 # -----------------------------
 # Judge parsing
 # -----------------------------
@@ -163,7 +264,7 @@ def parse_judge_json(text: str, choice_keys: list[str]) -> Dict[str, Any]:
     out = {"outputA": None, "outputB": None, "CRIT_A": None, "CRIT_B": None, "notes": ""}
 
     try:
-        obj = json.loads(text)
+        obj = _loads(text)
     except Exception:
         return out
 
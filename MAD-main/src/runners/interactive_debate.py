@@ -19,6 +19,7 @@ import json
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -26,10 +27,26 @@ import yaml
 
 from src.debate.models import LLMFactory
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 logger = logging.getLogger(__name__)
 
 
+def _save_json(path: Path, obj: Any) -> None:
+    """Write a JSON artifact (orjson when available, stdlib fallback)."""
+    if ORJSON_AVAILABLE:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
 def setup_logging(output_dir: Path) -> logging.Logger:
     """Basic logging to file + console for interactive runs."""
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -323,8 +340,7 @@ def generate_agent_brief(
     safe_name = "".join(c for c in name if c.isalnum() or c in (" ", "_", "-")).strip().replace(" ", "_")
     brief_path = briefs_dir / f"brief_agent{agent_index}_{safe_name}.json"
     try:
-        with open(brief_path, "w") as f:
-            json.dump(brief, f, indent=2, ensure_ascii=False)
+        _save_json(brief_path, brief)
         logger.info("Saved agent brief for %s to %s", name, brief_path)
     except Exception as e:
         logger.warning("Failed to save agent brief for %s: %s", name, e)
@@ -394,21 +410,31 @@ def run_interactive_debate(
     briefs_dir = output_dir / "briefs" / question_type_id
     agent_briefs: List[Dict[str, Any]] = []
 
+    # Assign models to agents (cycle through available models)
+    assigned_models = [agent_models[(idx - 1) % len(agent_models)] for idx in range(1, len(viewpoints) + 1)]
+
+    # Each agent's brief depends only on its own viewpoint, so generate them
+    # concurrently - they are the longest LLM calls in the whole session
+    with ThreadPoolExecutor(max_workers=len(viewpoints)) as pool:
+        brief_futures = [
+            pool.submit(generate_agent_brief, assigned_models[idx - 1], topic, vp, idx, briefs_dir)
+            for idx, vp in enumerate(viewpoints, start=1)
+        ]
+        agent_briefs.extend(f.result() for f in brief_futures)
+
     # Build agent personas
     agents: List[Dict[str, Any]] = []
     for idx, vp in enumerate(viewpoints, start=1):
         name = vp["name"]
-        
-        # Assign model to agent (cycle through available models)
-        agent_model = agent_models[(idx - 1) % len(agent_models)]
+
+        agent_model = assigned_models[idx - 1]
         model_key = ["A", "B", "C"][(idx - 1) % len(agent_models)]
         model_info = f"{pairing_cfg[model_key].get('provider', 'unknown')}/{pairing_cfg[model_key].get('model', 'unknown')}"
-        
+
         print(f"Agent {idx} ({name}) -> Model {model_key}: {model_info}")
         logger.info("Agent %d (%s) assigned model: %s (from %s)", idx, name, model_info, model_key)
 
-        brief = generate_agent_brief(agent_model, topic, vp, idx, briefs_dir)
-        agent_briefs.append(brief)
+        brief = agent_briefs[idx - 1]
 
         system_prompt = (
             f"You are an agent named '{name}'.\n"
@@ -452,10 +478,21 @@ def run_interactive_debate(
     )
 
     def format_history(limit_chars: int = 3000) -> str:
-        """Serialize recent conversation history to a single string."""
-        text = ""
-        for msg in conversation_log:
-            text += f"{msg['speaker']}: {msg['content']}\n"
+        """Serialize recent conversation history to a single string.
+
+        Only the tail of the transcript survives the limit, so accumulate
+        messages newest-first and stop once the limit is reached instead of
+        re-serializing the whole (ever-growing) log every turn.
+        """
+        lines: List[str] = []
+        total = 0
+        for msg in reversed(conversation_log):
+            line = f"{msg['speaker']}: {msg['content']}\n"
+            lines.append(line)
+            total += len(line)
+            if total >= limit_chars:
+                break
+        text = "".join(reversed(lines))
         if len(text) > limit_chars:
             return text[-limit_chars:]
         return text
@@ -508,9 +545,7 @@ def run_interactive_debate(
         "2) Highlight key agreements and disagreements.\n"
         "3) Provide a balanced assessment and (optionally) a tentative conclusion.\n"
     )
-    history_text = ""
-    for msg in conversation_log:
-        history_text += f"{msg['speaker']}: {msg['content']}\n"
+    history_text = "".join(f"{msg['speaker']}: {msg['content']}\n" for msg in conversation_log)
 
     judge_user = (
         f"Topic: {topic}\n\n"
@@ -544,13 +579,14 @@ def run_interactive_debate(
         )
     viewpoints_text = "\n".join(viewpoints_text_lines)
 
-    full_history = ""
+    full_history_lines = []
     for msg in conversation_log:
         round_tag = msg.get("round", None)
         if round_tag is not None:
-            full_history += f"[Round {round_tag}] {msg['speaker']}: {msg['content']}\n"
+            full_history_lines.append(f"[Round {round_tag}] {msg['speaker']}: {msg['content']}\n")
         else:
-            full_history += f"{msg['speaker']}: {msg['content']}\n"
+            full_history_lines.append(f"{msg['speaker']}: {msg['content']}\n")
+    full_history = "".join(full_history_lines)
 
     report_user = (
         f"Topic: {topic}\n\n"
@@ -676,8 +712,7 @@ def run_interactive_debate(
     # Save to disk
     timestamp = time.strftime("%Y%m%d_%H%M%S")
     outfile = output_dir / f"interactive_debate_{timestamp}.json"
-    with open(outfile, "w") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    _save_json(outfile, result)
     logger.info("Interactive debate saved to: %s", outfile)
 
     return result
@@ -19,6 +19,27 @@ from langgraph.graph import StateGraph
 from src.debate.graph import build_graph, DebateState
 from src.debate.prompts import parse_json_or_fallback, normalize_probs
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def save_json(path, obj):
+    """Write a result JSON file.
+
+    Debate states are large (full per-round outputs for every example);
+    orjson serializes them several times faster than stdlib json and writes
+    bytes directly. Falls back to stdlib json when orjson isn't installed.
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
 def setup_logging(output_dir: Path) -> logging.Logger:
     """Set up logging configuration"""
     # Create log file path
@@ -162,9 +183,9 @@ def load_dataset_from_config(dataset_config: Dict[str, Any]) -> List[Dict[str, A
         print(f"Error loading dataset {dataset_config.get('name', dataset_config.get('path', 'unknown'))}: {e}")
         return []
 
-def run_single_debate(example: Dict[str, Any], pairing: str, cfg_models: Dict,
+def run_single_debate(example: Dict[str, Any], pairing: str, compiled,
                      cfg_prompts: Dict, cfg_run: Dict) -> Dict[str, Any]:
-    """Run a single debate for one example"""
+    """Run a single debate for one example on an already-compiled graph"""
     logger = logging.getLogger(__name__)
     try:
         logger.info("    Starting debate for example %s", example.get("id", "unknown"))
@@ -178,9 +199,6 @@ def run_single_debate(example: Dict[str, Any], pairing: str, cfg_models: Dict,
             if isinstance(prompt_content, str):
                 logger.debug("      %s: %s characters", prompt_name, len(prompt_content))
 
-        # Build the debate graph
-        graph = build_graph(cfg_prompts, cfg_models, pairing, cfg_run.get('with_judge', True))
-        
         # Prepare initial state
         state = {
             'question': example['question'],
@@ -222,9 +240,30 @@ def run_single_debate(example: Dict[str, Any], pairing: str, cfg_models: Dict,
             'u_judge_r6': cfg_prompts['user_judge_r6'],
         }
         
+        # With checkpointing enabled, each example runs under its own
+        # thread_id. Resuming requires invoking with None input - passing the
+        # full state again would re-run the graph from the start instead of
+        # replaying the nodes already checkpointed.
+        config = None
+        result = None
+        if cfg_run.get('checkpoint_db'):
+            config = {"configurable": {"thread_id": str(example.get('id', 'unknown'))}}
+            try:
+                snapshot = compiled.get_state(config)
+            except Exception:
+                snapshot = None
+            if snapshot is not None and snapshot.values:
+                if snapshot.next:
+                    logger.info("    Resuming example %s from checkpoint", example.get('id', 'unknown'))
+                    result = compiled.invoke(None, config)
+                else:
+                    logger.info("    Example %s already completed in checkpoint; reusing result", example.get('id', 'unknown'))
+                    result = snapshot.values
+
         print(f"    Running debate graph...")
-        # Run the debate
-        result = graph.compile().invoke(state)
+        # Run the debate (fresh thread, or checkpointing disabled)
+        if result is None:
+            result = compiled.invoke(state, config) if config else compiled.invoke(state)
         print(f"    Debate completed successfully!")
         
         return {
@@ -319,7 +358,31 @@ def run_benchmark(benchmark_config: Dict, models_config: Dict,
     
     for pairing in benchmark_config['pairings']:
         logger.info(f"Running pairing: {pairing}")
-        
+
+        # Build and compile the debate graph once per pairing: models,
+        # topology and (optional) checkpointer are identical for every
+        # example, so the per-example rebuild/recompile cost (model client
+        # construction plus StateGraph.compile) drops out of the worker
+        # threads entirely
+        graph = build_graph(prompts_config, models_config, pairing,
+                            benchmark_config['run'].get('with_judge', True))
+        compiled = None
+        checkpoint_db = benchmark_config['run'].get('checkpoint_db')
+        if checkpoint_db:
+            try:
+                import sqlite3
+                from langgraph.checkpoint.sqlite import SqliteSaver
+                # Construct the saver directly: from_conn_string is a context
+                # manager in current langgraph, and the shared connection needs
+                # check_same_thread=False because one compiled graph is invoked
+                # from multiple worker threads
+                conn = sqlite3.connect(checkpoint_db, check_same_thread=False)
+                compiled = graph.compile(checkpointer=SqliteSaver(conn))
+            except ImportError:
+                logger.warning("langgraph.checkpoint.sqlite not available; running without checkpointing")
+        if compiled is None:
+            compiled = graph.compile()
+
         for dataset_name, examples in datasets.items():
             logger.info(f"  Dataset: {dataset_name} ({len(examples)} examples)")
             
@@ -332,7 +395,7 @@ def run_benchmark(benchmark_config: Dict, models_config: Dict,
                         run_single_debate,
                         example,
                         pairing,
-                        models_config,
+                        compiled,
                         prompts_config,
                         benchmark_config['run']
                     )
@@ -348,9 +411,8 @@ def run_benchmark(benchmark_config: Dict, models_config: Dict,
                         # Format: pairname_datasetnumber_examplenumber.json
                         example_number = i + 1
                         result_file = output_dir_metrics / dataset_name / f"{pairing}_{dataset_name}_{example_number}.json"
-                        with open(result_file, 'w') as f:
-                            json.dump(result, f, indent=2)
-                            
+                        save_json(result_file, result)
+
                         logger.info(f"    Saved: {result_file}")
                             
                     except Exception as e:
@@ -358,9 +420,8 @@ def run_benchmark(benchmark_config: Dict, models_config: Dict,
     
     # Save all results
     results_file = output_dir_metrics / "all_results.json"
-    with open(results_file, 'w') as f:
-        json.dump(all_results, f, indent=2)
-    
+    save_json(results_file, all_results)
+
     logger.info("Benchmark completed!")
     logger.info(f"Results saved to: {results_file}")
     logger.info(f"Individual runs saved to: {output_dir_runs}")
@@ -2,189 +2,55 @@
 """
 Test script for MMLU Professional Medicine dataset - Full Dataset Testing
 """
-import json
-import requests
-from datasets import load_dataset
-from src.debate.models import LLMFactory
-
-
-def test_mmlu_pro_med(start_example=1, end_example=127):
-    """Test MMLU Professional Medicine dataset - Custom Range
-    
-    Args:
-        start_example (int): Starting example number (1-indexed)
-        end_example (int): Ending example number (1-indexed, inclusive)
+import asyncio
+import io
+import os
+import re
+import sys
+import time
+from collections import deque
+
+import orjson
+from src.debate.models import LLMFactory, SHARED_SESSION
+from src.debate.cache import cached_invoke, semantic_lookup, semantic_store
+
+
+# Once the final round's answer letter and probs have streamed in, the rest of
+# the justification is never consumed downstream - stop generating it
+_EARLY_STOP_RE = re.compile(r'Final Answer:\s*\**\s*([ABCD])[\s\S]*?Probs:\s*(\{[^}]+\})')
+
+
+async def ainvoke_agent(agent, messages, stop_re=None):
+    """Run a blocking agent.invoke in a worker thread so concurrent agents' HTTP calls overlap.
+
+    Calls route through the on-disk response cache (keyed on endpoint,
+    messages and temperature). Note the agents here sample at temperature
+    0.7/0.8, where the cache stays inert unless MAD_CACHE_SAMPLED=1 is set -
+    re-running the dataset only skips re-issuing identical calls with that
+    explicit opt-in (which freezes one draw per prompt). When `stop_re` is
+    given and the agent supports streaming, generation is aborted as soon as
+    the pattern matches (partial responses bypass the cache).
     """
-    
-    # Set up output redirection to file
-    import sys
-    from datetime import datetime
-    
-    # Create filename based on model configuration and example range
-    filename = f"qwen_qwen_qwen_mmlu_pro_med_all_(from_{start_example}_to_{end_example}).txt"
-    
-    # Redirect stdout to both console and file
-    original_stdout = sys.stdout
-    
-    class TeeOutput:
-        def __init__(self, filename):
-            self.terminal = original_stdout
-            self.log = open(filename, 'w', encoding='utf-8')
-            self.log.write(f"=== MMLU Professional Medicine Test Output (Examples {start_example}-{end_example}) ===\n")
-            self.log.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.log.write(f"Filename: {filename}\n")
-            self.log.write("="*80 + "\n\n")
-        
-        def write(self, message):
-            self.terminal.write(message)
-            self.log.write(message)
-            self.log.flush()
-        
-        def flush(self):
-            self.terminal.flush()
-            self.log.flush()
-    
-    # Start output redirection
-    tee_output = TeeOutput(filename)
-    sys.stdout = tee_output
-    
-    print(f"=== MMLU Professional Medicine Test (Examples {start_example}-{end_example}) ===")
-    
-    # Check if litgpt models are accessible
-    import requests
-    import time
-    
-    print("🔍 Checking if litgpt models are accessible...")
-    ports = [8000, 8001, 8003]
-    model_names = ["Agent A", "Agent B", "Judge"]
-    
-    for port, name in zip(ports, model_names):
-        try:
-            response = requests.get(f"http://localhost:{port}/health", timeout=5)
-            if response.status_code == 200:
-                print(f"✅ {name} (port {port}) is accessible")
-            else:
-                print(f"⚠️ {name} (port {port}) returned status {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"❌ {name} (port {port}) is not accessible: {e}")
-            print(f"   Make sure to run: python launch_models.py")
-            return False
-    
-    print("✅ All models are accessible!")
-    
-    # Load dataset from local file
-    with open('data/mmlu_professional_medicine/test.jsonl', 'r') as f:
-        dataset = [json.loads(line) for line in f]
-    
-    print(f"Loaded {len(dataset)} examples from test.jsonl")
-    print(f"Testing examples {start_example} to {end_example}...")
-    
-    # Initialize debaters once
-    print("\n--- Initializing Debaters ---")
-    print("Using litgpt-served models on different ports...")
-    
-    # Initialize models using litgpt API endpoints
-    agent_a = LLMFactory.make("litgpt", "http://localhost:8000", temperature=0.7, max_tokens=1024)
-    agent_b = LLMFactory.make("litgpt", "http://localhost:8001", temperature=0.8, max_tokens=1024)
-    judge = LLMFactory.make("litgpt", "http://localhost:8003", temperature=0.2, max_tokens=2048)
-    
-    print("✅ Debaters initialized successfully (litgpt API mode)")
-    print("   Agent A: http://localhost:8000")
-    print("   Agent B: http://localhost:8001")
-    print("   Judge:   http://localhost:8003")
-    
-    # Process examples in the specified range (convert to 0-indexed)
-    start_idx = start_example - 1  # Convert to 0-indexed
-    end_idx = min(end_example, len(dataset))  # Ensure we don't exceed dataset size
-    
-    for example_idx in range(start_idx, end_idx):
-        example = dataset[example_idx]
-        
-        print(f"\n{'='*80}")
-        print(f"EXAMPLE {example_idx + 1}/{end_example}")
-        print(f"{'='*80}")
-        print(f"Question: {example['question'][:200]}...")
-        print(f"Choices: {example['choices']}")
-        print(f"Answer: {example['answer']}")
-        print(f"Question length: {len(example['question'])} characters")
-        
-        # Convert to our format
-        choices_dict = example['choices']  # Already in correct format
-        
-        choices_csv = ", ".join([f"{k}: {v}" for k, v in choices_dict.items()])
-        
-        # Store responses for each round
-        responses = {'A': {}, 'B': {}}
-        
-        # Round 1: Agent A -> Agent B
-        print("\n=== ROUND 1 ===")
-        
-        # Agent A Round 1
-        print("--- Agent A Round 1 ---")
-        debater_prompt_a1 = f"""Round 1: Initial Analysis
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
+    if stop_re is not None and hasattr(agent, "invoke_stream"):
+        return await asyncio.to_thread(agent.invoke_stream, messages, stop_re)
+    return await asyncio.to_thread(cached_invoke, agent, messages)
 
-Question: {example['question']}
-Choices: {choices_csv}"""
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_a1}
-            ]
-            
-            response_a1 = agent_a.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent A Round 1:")
-            print(f"   {response_a1.content}")
-            print(f"   {'='*80}")
-            
-            responses['A']['r1'] = response_a1.content
-            
-        except Exception as e:
-            print(f"❌ Agent A Round 1 failed: {e}")
-            continue
-        
-        # Agent B Round 1
-        print("--- Agent B Round 1 ---")
-        debater_prompt_b1 = f"""Round 1: Initial Analysis
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
+# One shared system message for every call: built once, referenced by all
+# rounds and both agents. LitGPTModel pins it server-side (session_id) on
+# first use, so the ~400-token prefix is prefetched/cached once per server
+# instead of re-sent and re-prefilled 12 times per example
+SYSTEM_MSG = {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."}
 
-Question: {example['question']}
-Choices: {choices_csv}"""
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_b1}
-            ]
-            
-            response_b1 = agent_b.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent B Round 1:")
-            print(f"   {response_b1.content}")
-            print(f"   {'='*80}")
-            
-            responses['B']['r1'] = response_b1.content
-            
-        except Exception as e:
-            print(f"❌ Agent B Round 1 failed: {e}")
-            continue
-        
-        # Round 2: Agent A -> Agent B
-        print("\n=== ROUND 2 ===")
-        
-        # Agent A Round 2
-        print("--- Agent A Round 2 ---")
-        debater_prompt_a2 = f"""Round 2: κ = 0.9 (highly contentious)
-Refute your opponent's answer and justifications. Press on weak assumptions. You may use careful counterfactuals to stress-test their claims. Then provide your probabilities and justification.
-
-Agent B's previous analysis: {responses['B']['r1']}
+def build_round1_messages(example):
+    """Round-1 messages for one example (identical for both agents).
 
+    Round 1 depends only on the question and choices - no cross-example or
+    cross-agent state - which is what makes it batchable across the dataset.
+    """
+    choices_csv = ", ".join([f"{k}: {v}" for k, v in example['choices'].items()])
+    prompt = f"""Round 1: Initial Analysis
 Output format (always):
 1. Your Final Answer: A/B/C/D
 2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
@@ -192,167 +58,188 @@ Output format (always):
 
 Question: {example['question']}
 Choices: {choices_csv}"""
+    return [
+        SYSTEM_MSG,
+        {"role": "user", "content": prompt}
+    ]
+
+
+# Rounds 2-6: (round, round-specific instructions, opponent round to quote).
+# Round 1 is batched across examples before the debates start. Contentiousness
+# κ anneals from adversarial (0.9) to consolidating (0.1) over the debate.
+ROUND_SCHEDULE = [
+    (2, """κ = 0.9 (highly contentious)
+Refute your opponent's answer and justifications. Press on weak assumptions. You may use careful counterfactuals to stress-test their claims. Then provide your probabilities and justification.""", 'r1'),
+    (3, """κ = 0.7 (moderately contentious)
+Engage with your opponent's arguments more constructively. Acknowledge valid points while still defending your position. Look for areas of agreement and disagreement.""", 'r2'),
+    (4, """κ = 0.5 (balanced)
+Take a more balanced approach. Consider both your position and your opponent's arguments. Look for synthesis and common ground while maintaining your core reasoning.""", 'r3'),
+    (5, """κ = 0.3 (low contentiousness)
+Focus on finding common ground and synthesis. Acknowledge the strongest points from both sides. Work towards a collaborative solution while maintaining your core position.""", 'r4'),
+    (6, """κ = 0.1 (very low contentiousness - final synthesis)
+This is the final round. Synthesize the best arguments from both sides. Provide your final, most confident answer based on the entire debate. Acknowledge the strongest points from your opponent and explain why your position is ultimately correct.""", 'r5'),
+]
+
+
+# Circuit breaker: when an agent server dies mid-run, every round fails fast
+# and the example loop would otherwise burn through the whole remaining range
+# doing nothing. Repeated failures in a short window abort the run instead.
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_WINDOW = 30.0  # seconds
+_recent_failures = deque(maxlen=10)
+
+
+class CircuitBreakerTripped(RuntimeError):
+    """Raised when repeated round failures indicate a dead agent server."""
+
+
+def _record_failure():
+    now = time.monotonic()
+    _recent_failures.append(now)
+    recent = [t for t in _recent_failures if now - t <= CIRCUIT_BREAKER_WINDOW]
+    if len(recent) >= CIRCUIT_BREAKER_THRESHOLD:
+        raise CircuitBreakerTripped(
+            f"Circuit breaker: agent server unresponsive "
+            f"({len(recent)} round failures within {CIRCUIT_BREAKER_WINDOW:.0f}s)"
+        )
+
+
+# Every response carries a Probs substring in the fixed {"A": pA, ...} output
+# format; one compiled pattern parses all ~1500 of them per run
+PROBS_RE = re.compile(r'\{"A":\s*([\d.]+),\s*"B":\s*([\d.]+),\s*"C":\s*([\d.]+),\s*"D":\s*([\d.]+)\}')
+
+
+def summarize_probs(debate_results, dataset, emit):
+    """Vectorized post-run aggregation over every round's Probs output.
+
+    All raw responses go into one pandas Series; a single .str.extract with
+    the compiled pattern yields an (N, 4) float32 matrix, and the aggregates
+    (top-choice confidence, entropy, final-round accuracy vs the gold answer)
+    run as NumPy operations over the whole matrix instead of per-response
+    json.loads calls in a Python loop.
+    """
+    try:
+        import numpy as np
+        import pandas as pd
+    except ImportError:
+        emit("⚠️ pandas/numpy not installed - skipping probs summary")
+        return
+
+    rows = []
+    for i in sorted(debate_results):
+        for agent_id in ('A', 'B'):
+            for key, content in debate_results[i][agent_id].items():
+                if key.endswith('_raw'):
+                    rows.append((i, agent_id, int(key[1]), content))
+    if not rows:
+        return
+
+    frame = pd.DataFrame(rows, columns=['example', 'agent', 'round', 'content'])
+    probs = frame['content'].str.extract(PROBS_RE).astype(np.float32)
+    probs.columns = ['A', 'B', 'C', 'D']
+    matrix = probs.to_numpy()
+    valid = ~np.isnan(matrix).any(axis=1)
+
+    emit(f"\n--- Probs summary ({int(valid.sum())}/{len(frame)} responses parsed) ---")
+    if not valid.any():
+        return
+    top_conf = np.nanmax(matrix[valid], axis=1)
+    entropy = -np.sum(matrix[valid] * np.log(np.clip(matrix[valid], 1e-9, None)), axis=1)
+    emit(f"   Mean top-choice confidence: {top_conf.mean():.3f}")
+    emit(f"   Mean probs entropy: {entropy.mean():.3f} nats")
+
+    final = frame[valid & (frame['round'] == frame.groupby('example')['round'].transform('max'))]
+    if len(final):
+        picks = probs.loc[final.index].idxmax(axis=1)
+        answers = final['example'].map(lambda i: dataset[i]['answer'])
+        emit(f"   Final-round argmax accuracy: {(picks == answers).mean():.3f} over {len(final)} agent verdicts")
+
+
+# Embedding each full response into the opponent's next prompt makes round N
+# re-tokenize every earlier round's text - O(N²) prompt tokens per example.
+# The structured Final Answer + Probs (always at the top of the response) are
+# all the next round needs for debate continuity, so context copies are capped
+CONTEXT_MAX_WORDS = 120
+
+
+def truncate_for_context(content):
+    """Trim a response before it is embedded into the opponent's next prompt.
+
+    Keeps the leading Final Answer / Probs block plus the start of the
+    justification (whitespace words as a cheap token proxy). The untruncated
+    text is kept separately for the log and the judge.
+    """
+    words = content.split()
+    if len(words) <= CONTEXT_MAX_WORDS:
+        return content
+    return " ".join(words[:CONTEXT_MAX_WORDS]) + " ...[truncated]"
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_a2}
-            ]
-            
-            response_a2 = agent_a.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent A Round 2:")
-            print(f"   {response_a2.content}")
-            print(f"   {'='*80}")
-            
-            responses['A']['r2'] = response_a2.content
-            
-        except Exception as e:
-            print(f"❌ Agent A Round 2 failed: {e}")
-            continue
-        
-        # Agent B Round 2
-        print("--- Agent B Round 2 ---")
-        debater_prompt_b2 = f"""Round 2: κ = 0.9 (highly contentious)
-Refute your opponent's answer and justifications. Press on weak assumptions. You may use careful counterfactuals to stress-test their claims. Then provide your probabilities and justification.
 
-Agent A's previous analysis: {responses['A']['r1']}
+# Judge calls are independent across examples, so they all run after the
+# debates as batched requests instead of one round-trip per example
+JUDGE_BATCH_SIZE = 16
 
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
+JUDGE_SYSTEM_MSG = {"role": "system", "content": "You are the judge of a debate between two agents on a 4-choice question (A/B/C/D). Weigh both agents' final analyses and decide the answer. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."}
 
-Question: {example['question']}
-Choices: {choices_csv}"""
-
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_b2}
-            ]
-            
-            response_b2 = agent_b.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent B Round 2:")
-            print(f"   {response_b2.content}")
-            print(f"   {'='*80}")
-            
-            responses['B']['r2'] = response_b2.content
-            
-        except Exception as e:
-            print(f"❌ Agent B Round 2 failed: {e}")
-            continue
-        
-        # Continue with remaining rounds (3-6) following the same pattern
-        print("\n=== ROUNDS 3-6 (Full Implementation) ===")
-        
-        # Round 3: Agent A -> Agent B
-        print("\n=== ROUND 3 ===")
-        
-        # Agent A Round 3
-        print("--- Agent A Round 3 ---")
-        debater_prompt_a3 = f"""Round 3: κ = 0.7 (moderately contentious)
-Engage with your opponent's arguments more constructively. Acknowledge valid points while still defending your position. Look for areas of agreement and disagreement.
-
-Agent B's previous analysis: {responses['B']['r2']}
 
+def build_judge_messages(example, responses):
+    """Judge messages for one completed debate (final-round analyses only)."""
+    choices_csv = ", ".join([f"{k}: {v}" for k, v in example['choices'].items()])
+    # Judge on the latest round both agents completed, untruncated
+    final_key = max(k for k in responses['A'] if k in responses['B'] and not k.endswith('_raw'))
+    final_a = responses['A'].get(f'{final_key}_raw', responses['A'][final_key])
+    final_b = responses['B'].get(f'{final_key}_raw', responses['B'][final_key])
+    prompt = f"""Judge the following debate.
 Output format (always):
 1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
+2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00.
+3. Rationale: up to 3 sentences explaining which agent's reasoning you found more convincing.
 
 Question: {example['question']}
-Choices: {choices_csv}"""
+Choices: {choices_csv}
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_a3}
-            ]
-            
-            response_a3 = agent_a.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent A Round 3:")
-            print(f"   {response_a3.content}")
-            print(f"   {'='*80}")
-            
-            responses['A']['r3'] = response_a3.content
-            
-        except Exception as e:
-            print(f"❌ Agent A Round 3 failed: {e}")
-            continue
-        
-        # Agent B Round 3
-        print("--- Agent B Round 3 ---")
-        debater_prompt_b3 = f"""Round 3: κ = 0.7 (moderately contentious)
-Engage with your opponent's arguments more constructively. Acknowledge valid points while still defending your position. Look for areas of agreement and disagreement.
+Agent A's final analysis: {final_a}
 
-Agent A's previous analysis: {responses['A']['r2']}
+Agent B's final analysis: {final_b}"""
+    return [
+        JUDGE_SYSTEM_MSG,
+        {"role": "user", "content": prompt}
+    ]
 
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
 
-Question: {example['question']}
-Choices: {choices_csv}"""
+async def run_example(example_idx, example, agent_a, agent_b, end_example, round1):
+    """Run the full 6-round debate for one example.
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_b3}
-            ]
-            
-            response_b3 = agent_b.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent B Round 3:")
-            print(f"   {response_b3.content}")
-            print(f"   {'='*80}")
-            
-            responses['B']['r3'] = response_b3.content
-            
-        except Exception as e:
-            print(f"❌ Agent B Round 3 failed: {e}")
-            continue
-        
-        # Round 4: Agent A -> Agent B
-        print("\n=== ROUND 4 ===")
-        
-        # Agent A Round 4
-        print("--- Agent A Round 4 ---")
-        debater_prompt_a4 = f"""Round 4: κ = 0.5 (balanced)
-Take a more balanced approach. Consider both your position and your opponent's arguments. Look for synthesis and common ground while maintaining your core reasoning.
-
-Agent B's previous analysis: {responses['B']['r3']}
+    Returns (buffer, responses). All output goes to a per-example StringIO
+    buffer (returned to the caller, also on failure), so concurrently running
+    examples never interleave lines; the per-round responses feed the batched
+    judge phase after all debates finish.
+    """
+    out = io.StringIO()
 
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
+    def print(*args, sep=" ", end="\n"):  # shadows builtins.print on purpose
+        out.write(sep.join(str(a) for a in args) + end)
 
-Question: {example['question']}
-Choices: {choices_csv}"""
+    def print_response_block(label, content):
+        out.write(f"🔍 RAW RESPONSE - {label}:\n   {content}\n   {'='*80}\n")
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_a4}
-            ]
-            
-            response_a4 = agent_a.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent A Round 4:")
-            print(f"   {response_a4.content}")
-            print(f"   {'='*80}")
-            
-            responses['A']['r4'] = response_a4.content
-            
-        except Exception as e:
-            print(f"❌ Agent A Round 4 failed: {e}")
-            continue
-        
-        # Agent B Round 4
-        print("--- Agent B Round 4 ---")
-        debater_prompt_b4 = f"""Round 4: κ = 0.5 (balanced)
-Take a more balanced approach. Consider both your position and your opponent's arguments. Look for synthesis and common ground while maintaining your core reasoning.
+    print(f"\n{'='*80}")
+    print(f"EXAMPLE {example_idx + 1}/{end_example}")
+    print(f"{'='*80}")
+    print(f"Question: {example['question'][:200]}...")
+    print(f"Choices: {example['choices']}")
+    print(f"Answer: {example['answer']}")
+    print(f"Question length: {len(example['question'])} characters")
+    
+    # Convert to our format
+    choices_dict = example['choices']  # Already in correct format
+    
+    choices_csv = ", ".join([f"{k}: {v}" for k, v in choices_dict.items()])
 
-Agent A's previous analysis: {responses['A']['r3']}
+    # Invariant per-example suffix (output spec + question + choices), built
+    # once and appended to every round's variable head instead of being
+    # re-interpolated ten times per example
+    prompt_tail = f"""
 
 Output format (always):
 1. Your Final Answer: A/B/C/D
@@ -362,180 +249,275 @@ Output format (always):
 Question: {example['question']}
 Choices: {choices_csv}"""
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_b4}
-            ]
-            
-            response_b4 = agent_b.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent B Round 4:")
-            print(f"   {response_b4.content}")
-            print(f"   {'='*80}")
-            
-            responses['B']['r4'] = response_b4.content
-            
-        except Exception as e:
-            print(f"❌ Agent B Round 4 failed: {e}")
-            continue
-        
-        # Round 5: Agent A -> Agent B
-        print("\n=== ROUND 5 ===")
-        
-        # Agent A Round 5
-        print("--- Agent A Round 5 ---")
-        debater_prompt_a5 = f"""Round 5: κ = 0.3 (low contentiousness)
-Focus on finding common ground and synthesis. Acknowledge the strongest points from both sides. Work towards a collaborative solution while maintaining your core position.
-
-Agent B's previous analysis: {responses['B']['r4']}
-
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
-
-Question: {example['question']}
-Choices: {choices_csv}"""
+    # Store responses for each round
+    responses = {'A': {}, 'B': {}}
+    
+    # Round 1: precomputed by the cross-example batched requests
+    print("\n=== ROUND 1 ===")
+
+    responses['A']['r1_raw'], responses['B']['r1_raw'] = round1
+    responses['A']['r1'] = truncate_for_context(responses['A']['r1_raw'])
+    responses['B']['r1'] = truncate_for_context(responses['B']['r1_raw'])
+    print_response_block("Agent A Round 1", responses['A']['r1_raw'])
+    print_response_block("Agent B Round 1", responses['B']['r1_raw'])
+
+    # Rounds 2-6 run through one data-driven loop: each round builds both
+    # agents' prompts from the schedule and fires them concurrently
+    for rnd, instructions, prev_key in ROUND_SCHEDULE:
+        print(f"\n=== ROUND {rnd}{' (FINAL)' if rnd == 6 else ''} ===")
+
+        prompts = {}
+        for agent_id, opponent_id in (('A', 'B'), ('B', 'A')):
+            prompts[agent_id] = (f"Round {rnd}: {instructions}\n\n"
+                                 f"Agent {opponent_id}'s previous analysis: {responses[opponent_id][prev_key]}"
+                                 + prompt_tail)
 
         try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_a5}
-            ]
-            
-            response_a5 = agent_a.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent A Round 5:")
-            print(f"   {response_a5.content}")
-            print(f"   {'='*80}")
-            
-            responses['A']['r5'] = response_a5.content
-            
+            # Rounds 2-5 feed their full text into the opponent's next prompt;
+            # only round 6's tail is never consumed, so only it may stop early
+            stop_re = _EARLY_STOP_RE if rnd == 6 else None
+            response_a, response_b = await asyncio.gather(
+                ainvoke_agent(agent_a, [SYSTEM_MSG, {"role": "user", "content": prompts['A']}], stop_re=stop_re),
+                ainvoke_agent(agent_b, [SYSTEM_MSG, {"role": "user", "content": prompts['B']}], stop_re=stop_re)
+            )
+            suffix = " (Final)" if rnd == 6 else ""
+            print_response_block(f"Agent A Round {rnd}{suffix}", response_a.content)
+            print_response_block(f"Agent B Round {rnd}{suffix}", response_b.content)
+
+            responses['A'][f'r{rnd}_raw'] = response_a.content
+            responses['B'][f'r{rnd}_raw'] = response_b.content
+            responses['A'][f'r{rnd}'] = truncate_for_context(response_a.content)
+            responses['B'][f'r{rnd}'] = truncate_for_context(response_b.content)
+
         except Exception as e:
-            print(f"❌ Agent A Round 5 failed: {e}")
-            continue
-        
-        # Agent B Round 5
-        print("--- Agent B Round 5 ---")
-        debater_prompt_b5 = f"""Round 5: κ = 0.3 (low contentiousness)
-Focus on finding common ground and synthesis. Acknowledge the strongest points from both sides. Work towards a collaborative solution while maintaining your core position.
+            print(f"❌ Round {rnd} failed: {e}")
+            _record_failure()
+            return out, responses
 
-Agent A's previous analysis: {responses['A']['r4']}
+    print(f"\n✅ Example {example_idx + 1} completed successfully!")
+    print(f"   Agent A responses: {list(responses['A'].keys())}")
+    print(f"   Agent B responses: {list(responses['B'].keys())}")
+    print(f"   Total rounds completed: 6")
+    print(f"   Contentiousness progression: 0.9 → 0.9 → 0.7 → 0.5 → 0.3 → 0.1")
 
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
+    return out, responses
 
-Question: {example['question']}
-Choices: {choices_csv}"""
-
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_b5}
-            ]
-            
-            response_b5 = agent_b.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent B Round 5:")
-            print(f"   {response_b5.content}")
-            print(f"   {'='*80}")
-            
-            responses['B']['r5'] = response_b5.content
-            
-        except Exception as e:
-            print(f"❌ Agent B Round 5 failed: {e}")
-            continue
-        
-        # Round 6: Agent A -> Agent B (Final Round)
-        print("\n=== ROUND 6 (FINAL) ===")
-        
-        # Agent A Round 6
-        print("--- Agent A Round 6 (Final) ---")
-        debater_prompt_a6 = f"""Round 6: κ = 0.1 (very low contentiousness - final synthesis)
-This is the final round. Synthesize the best arguments from both sides. Provide your final, most confident answer based on the entire debate. Acknowledge the strongest points from your opponent and explain why your position is ultimately correct.
-
-Agent B's previous analysis: {responses['B']['r5']}
 
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
-
-Question: {example['question']}
-Choices: {choices_csv}"""
+async def test_mmlu_pro_med(start_example=1, end_example=127):
+    """Test MMLU Professional Medicine dataset - Custom Range
+    
+    Args:
+        start_example (int): Starting example number (1-indexed)
+        end_example (int): Ending example number (1-indexed, inclusive)
+    """
+    
+    from datetime import datetime
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_a6}
-            ]
-            
-            response_a6 = agent_a.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent A Round 6 (Final):")
-            print(f"   {response_a6.content}")
-            print(f"   {'='*80}")
-            
-            responses['A']['r6'] = response_a6.content
-            
-        except Exception as e:
-            print(f"❌ Agent A Round 6 (Final) failed: {e}")
-            continue
-        
-        # Agent B Round 6
-        print("--- Agent B Round 6 (Final) ---")
-        debater_prompt_b6 = f"""Round 6: κ = 0.1 (very low contentiousness - final synthesis)
-This is the final round. Synthesize the best arguments from both sides. Provide your final, most confident answer based on the entire debate. Acknowledge the strongest points from your opponent and explain why your position is ultimately correct.
+    # Create filename based on model configuration and example range
+    filename = f"qwen_qwen_qwen_mmlu_pro_med_all_(from_{start_example}_to_{end_example}).txt"
 
-Agent A's previous analysis: {responses['A']['r5']}
+    # One log file for the run; completed examples append their buffered
+    # output here under a lock, so there is no global stdout redirection and
+    # no per-line flushing on the hot path
+    log = open(filename, 'w', encoding='utf-8', buffering=8192)
+    log.write(f"=== MMLU Professional Medicine Test Output (Examples {start_example}-{end_example}) ===\n")
+    log.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    log.write(f"Filename: {filename}\n")
+    log.write("="*80 + "\n\n")
 
-Output format (always):
-1. Your Final Answer: A/B/C/D
-2. Probs: {{"A": pA, "B": pB, "C": pC, "D": pD}} - probabilities that sum to 1.00. Each probability represents the likelihood that this choice is final answer.
-3. Justification: up to 5 sentences citing the key reasons.
+    def emit(message):
+        print(message)
+        log.write(message + "\n")
 
-Question: {example['question']}
-Choices: {choices_csv}"""
+    emit(f"=== MMLU Professional Medicine Test (Examples {start_example}-{end_example}) ===")
+    
+    # Check if litgpt models are accessible (over the shared pooled session,
+    # so the warm connections carry straight over into the agent calls)
+    emit("🔍 Checking if litgpt models are accessible...")
+    ports = [8000, 8001, 8003]
+    model_names = ["Agent A", "Agent B", "Judge"]
+    
+    def probe(port):
+        return SHARED_SESSION.get(f"http://localhost:{port}/health", timeout=5)
+
+    # Probe all three servers concurrently: worst case is one 5s timeout
+    # instead of three in sequence
+    results = await asyncio.gather(
+        *[asyncio.to_thread(probe, port) for port in ports],
+        return_exceptions=True
+    )
+    all_ok = True
+    for port, name, result in zip(ports, model_names, results):
+        if isinstance(result, Exception):
+            emit(f"❌ {name} (port {port}) is not accessible: {result}")
+            emit(f"   Make sure to run: python launch_models.py")
+            all_ok = False
+        elif result.status_code == 200:
+            emit(f"✅ {name} (port {port}) is accessible")
+        else:
+            emit(f"⚠️ {name} (port {port}) returned status {result.status_code}")
+    if not all_ok:
+        return False
+    
+    emit("✅ All models are accessible!")
+    
+    # Load dataset from local file (orjson parses the JSONL lines directly
+    # from bytes, several times faster than stdlib json)
+    with open('data/mmlu_professional_medicine/test.jsonl', 'rb') as f:
+        dataset = [orjson.loads(line) for line in f]
+    
+    emit(f"Loaded {len(dataset)} examples from test.jsonl")
+    emit(f"Testing examples {start_example} to {end_example}...")
+    
+    # Initialize debaters once
+    emit("\n--- Initializing Debaters ---")
+    emit("Using litgpt-served models on different ports...")
+    
+    # Initialize models using litgpt API endpoints
+    agent_a = LLMFactory.make("litgpt", "http://localhost:8000", temperature=0.7, max_tokens=1024)
+    agent_b = LLMFactory.make("litgpt", "http://localhost:8001", temperature=0.8, max_tokens=1024)
+    judge = LLMFactory.make("litgpt", "http://localhost:8003", temperature=0.2, max_tokens=2048)
+    
+    emit("✅ Debaters initialized successfully (litgpt API mode)")
+    emit("   Agent A: http://localhost:8000")
+    emit("   Agent B: http://localhost:8001")
+    emit("   Judge:   http://localhost:8003")
+    
+    # Process examples in the specified range (convert to 0-indexed)
+    start_idx = start_example - 1  # Convert to 0-indexed
+    end_idx = min(end_example, len(dataset))  # Ensure we don't exceed dataset size
 
+    # Independent examples run concurrently; the semaphore bounds how many are
+    # in flight so the litgpt servers' batch/KV budgets aren't oversubscribed
+    sem = asyncio.Semaphore(int(os.getenv("MAD_EXAMPLE_CONCURRENCY", "8")))
+    write_lock = asyncio.Lock()
+
+    # Round 1 has no cross-example dependencies: send every example's Round-1
+    # prompt in one batched request per agent, then debate rounds 2-6
+    # Resume sidecar: completed example indices survive a crash or a tripped
+    # circuit breaker, so a rerun of the same range skips what's already done
+    # instead of restarting from start_example
+    resume_path = filename.replace('.txt', '.resume.json')
+    completed = set()
+    if os.path.exists(resume_path):
         try:
-            messages = [
-                {"role": "system", "content": "You are debating another agent on a 4-choice question (A/B/C/D). \"Contentiousness\" κ controls how strongly you challenge the opponent: κ=0.9 is highly adversarial; κ=0.1 is mostly consolidating. Follow the exact output format specified. IMPORTANT: Always provide Final Answer first, then Probs in JSON format {{\"A\": pA, \"B\": pB, \"C\": pC, \"D\": pD}} where probabilities sum to 1.00."},
-                {"role": "user", "content": debater_prompt_b6}
-            ]
-            
-            response_b6 = agent_b.invoke(messages)
-            print(f"🔍 RAW RESPONSE - Agent B Round 6 (Final):")
-            print(f"   {response_b6.content}")
-            print(f"   {'='*80}")
-            
-            responses['B']['r6'] = response_b6.content
-            
-        except Exception as e:
-            print(f"❌ Agent B Round 6 (Final) failed: {e}")
-            continue
-        
-        print(f"\n✅ Example {example_idx + 1} completed successfully!")
-        print(f"   Agent A responses: {list(responses['A'].keys())}")
-        print(f"   Agent B responses: {list(responses['B'].keys())}")
-        print(f"   Total rounds completed: 6")
-        print(f"   Contentiousness progression: 0.9 → 0.9 → 0.7 → 0.5 → 0.3 → 0.1")
-    
-    print(f"\n{'='*80}")
-    print(f"=== MMLU Professional Medicine Test Results (Examples {start_example}-{end_example}) ===")
-    print(f"✅ Test completed successfully!")
-    print(f"   Total examples processed: {end_idx - start_idx}")
-    print(f"   Output saved to: {filename}")
-    print(f"{'='*80}")
+            with open(resume_path, 'rb') as f:
+                completed = set(orjson.loads(f.read())["completed"])
+            emit(f"🔁 Resuming: {len(completed)} examples already completed per {resume_path}")
+        except Exception:
+            completed = set()
+
+    emit("\n--- Batching Round 1 across all examples ---")
+    indices = [i for i in range(start_idx, end_idx) if i not in completed]
+
+    # Semantic cache first: near-duplicate questions from earlier runs (or
+    # earlier examples in this run) reuse their Round-1 analyses instead of
+    # hitting the servers. Only misses go into the batched requests.
+    key_texts = {i: dataset[i]['question'] + str(dataset[i]['choices']) for i in indices}
+    round1 = {}
+    misses = []
+    for i in indices:
+        hit_a = semantic_lookup(agent_a, key_texts[i])
+        hit_b = semantic_lookup(agent_b, key_texts[i])
+        if hit_a is not None and hit_b is not None:
+            round1[i] = (hit_a, hit_b)
+        else:
+            misses.append(i)
+    if len(round1):
+        emit(f"✅ Round 1 semantic cache hits: {len(round1)}/{len(indices)}")
+
+    if misses:
+        r1_messages = [build_round1_messages(dataset[i]) for i in misses]
+        r1_a, r1_b = await asyncio.gather(
+            asyncio.to_thread(agent_a.invoke_batch, r1_messages),
+            asyncio.to_thread(agent_b.invoke_batch, r1_messages),
+        )
+        for i, ra, rb in zip(misses, r1_a, r1_b):
+            round1[i] = (ra.content, rb.content)
+            semantic_store(agent_a, key_texts[i], ra.content)
+            semantic_store(agent_b, key_texts[i], rb.content)
+    emit(f"✅ Round 1 complete for {len(indices)} examples")
+
+    debate_results = {}
+
+    async def bounded_example(example_idx):
+        async with sem:
+            out, responses = await run_example(example_idx, dataset[example_idx], agent_a, agent_b, end_example, round1[example_idx])
+        debate_results[example_idx] = responses
+        async with write_lock:
+            # One join'd write per example; the 8KB file buffer absorbs the
+            # rest, so no fsync-latency stalls inside the inference loop
+            text = out.getvalue()
+            sys.stdout.write(text)
+            log.write(text)
+            if 'r6' in responses['A'] and 'r6' in responses['B']:
+                completed.add(example_idx)
+                with open(resume_path, 'wb') as f:
+                    f.write(orjson.dumps({"completed": sorted(completed)}))
+
+    # return_exceptions lets every in-flight example finish (or fail fast)
+    # before the breaker is handled, so their buffered output and resume
+    # sidecar updates are not lost to an exception racing through gather
+    gather_results = await asyncio.gather(*[bounded_example(i) for i in indices],
+                                          return_exceptions=True)
+    tripped = next((r for r in gather_results if isinstance(r, CircuitBreakerTripped)), None)
+    if tripped is not None:
+        emit(f"\n❌ {tripped}")
+        emit(f"   Aborting run; {len(completed)} completed examples recorded in {resume_path}")
+        emit(f"   Restart the servers and rerun the same range to resume.")
+        log.close()
+        print(f"📁 Partial output saved to: {filename}")
+        return False
+    for r in gather_results:
+        if isinstance(r, BaseException):
+            raise r
+
+    # Judge phase: every completed debate's verdict in batched requests of
+    # JUDGE_BATCH_SIZE instead of 127 sequential round-trips to port 8003
+    emit("\n--- Batching Judge verdicts ---")
+    judged = [i for i in sorted(debate_results)
+              if debate_results[i]['A'] and debate_results[i]['B']]
+    judge_inputs = [build_judge_messages(dataset[i], debate_results[i]) for i in judged]
+    verdicts = []
+    for offset in range(0, len(judge_inputs), JUDGE_BATCH_SIZE):
+        batch = judge_inputs[offset:offset + JUDGE_BATCH_SIZE]
+        verdicts.extend(await asyncio.to_thread(judge.invoke_batch, batch))
+    for i, verdict in zip(judged, verdicts):
+        emit(f"\n=== JUDGE VERDICT - Example {i + 1} ===")
+        emit(verdict.content)
+    emit(f"✅ Judge verdicts complete for {len(judged)} examples")
+
+    # Bulk probs analysis over every stored response in one vectorized pass
+    summarize_probs(debate_results, dataset, emit)
+
+    emit(f"\n{'='*80}")
+    emit(f"=== MMLU Professional Medicine Test Results (Examples {start_example}-{end_example}) ===")
+    emit(f"✅ Test completed successfully!")
+    emit(f"   Total examples processed: {len(indices)}")
+    emit(f"   Output saved to: {filename}")
+    emit(f"{'='*80}")
+
+    # A fully completed range no longer needs its resume sidecar
+    if len(completed) == end_idx - start_idx:
+        try:
+            os.remove(resume_path)
+        except FileNotFoundError:
+            pass
     
-    # Clean up output redirection
-    sys.stdout = original_stdout
-    tee_output.log.close()
+    log.close()
     print(f"📁 Output saved to: {filename}")
     
     return True
 
 if __name__ == "__main__":
-    import sys
-    
+    # uvloop's event loop is 2-4x faster than the default for I/O-heavy
+    # workloads like this one (pure HTTP fan-out); fall back silently
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     # Parse command line arguments for range
     if len(sys.argv) == 3:
         start_example = int(sys.argv[1])
@@ -550,7 +532,7 @@ if __name__ == "__main__":
         end_example = 127
         print(f"🎯 Running all examples (1 to {end_example})")
     
-    success = test_mmlu_pro_med(start_example, end_example)
+    success = asyncio.run(test_mmlu_pro_med(start_example, end_example))
     if success:
         print(f"🎉 MMLU Professional Medicine test (examples {start_example}-{end_example}) passed!")
     else:
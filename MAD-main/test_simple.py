@@ -3,6 +3,18 @@
 Simple test to check litgpt response limits
 """
 import requests
+from urllib3.util.retry import Retry
+
+# One pooled keep-alive session for every request in this script: both test
+# prompts (and any retries) reuse the same TCP connection instead of paying
+# connection setup per call
+SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=10, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.5)
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
 
 def test_simple_prompt():
     """Test with a very simple prompt"""
@@ -20,7 +32,7 @@ def test_simple_prompt():
     }
     
     try:
-        response = requests.post("http://localhost:8000/predict", json=data, timeout=60)
+        response = SESSION.post("http://localhost:8000/predict", json=data, timeout=60)
         if response.status_code == 200:
             result = response.json()
             print(f"✅ Success! Response length: {len(result.get('output', ''))}")
@@ -48,7 +60,7 @@ Answer:"""
     }
     
     try:
-        response = requests.post("http://localhost:8000/predict", json=data, timeout=60)
+        response = SESSION.post("http://localhost:8000/predict", json=data, timeout=60)
         if response.status_code == 200:
             result = response.json()
             print(f"✅ Success! Response length: {len(result.get('output', ''))}")